@@ -17,6 +17,8 @@ import time
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.asymmetric import dh, ec, padding, rsa
 
+from modular_exponentiation import FixedBaseExponentiation
+
 #!##################################################################
 #! Q1 - Elgamal public key encryption algorithm
 #!##################################################################
@@ -27,13 +29,14 @@ class Elgamal:
     Elgamal public key encryption algorithm
     """
 
-    def __init__(self, prime_q: int, root: int) -> None:
+    def __init__(self, prime_q: int, root: int, window: int = 6) -> None:
         """
         Public Key Crypto
 
         Args:
             prime_q (int): prime number
             root (int): primitive root of prime_q
+            window (int, optional): bits per digit of the precomputed root^k table, 0 to use pow. Defaults to 6.
         """
         self.prime_q: int = prime_q
         self.root: int = root
@@ -41,6 +44,25 @@ class Elgamal:
         self.ya: int = None
         self.k: int = None
         self.K: int = None
+        self.root_power: FixedBaseExponentiation = None
+        if window:
+            self.root_power = FixedBaseExponentiation(
+                root, prime_q, prime_q.bit_length(), window
+            )
+
+    def _pow_root(self, exponent: int) -> int:
+        """
+        Compute root^exponent mod q with the fixed-base table when there is one
+
+        Args:
+            exponent (int): exponent
+
+        Returns:
+            int: root^exponent mod q
+        """
+        if self.root_power is None:
+            return pow(base=self.root, exp=exponent, mod=self.prime_q)
+        return self.root_power.exp(exponent)
 
     def __repr__(self) -> str:
         """
@@ -72,7 +94,7 @@ class Elgamal:
         """
         Compute YA (public key)
         """
-        self.ya = pow(base=self.root, exp=self.xa, mod=self.prime_q)
+        self.ya = self._pow_root(self.xa)
 
     def set_k(self, k: int = None) -> None:
         """
@@ -121,7 +143,7 @@ class Elgamal:
         Returns:
             tuple[int, int]: ciphertext
         """
-        c1 = pow(base=self.root, exp=self.k, mod=self.prime_q)
+        c1 = self._pow_root(self.k)
         c2 = (self.K * message) % self.prime_q
         return (c1, c2)
 
@@ -216,9 +238,9 @@ def miller_rabin(odd_integer: int, confidence: int) -> bool:
     k = 0
     reduction = odd_integer - 1
     while reduction % 2 == 0:
-        reduction /= 2
+        reduction //= 2
         k += 1
-    q = (odd_integer - 1) // (2**k)
+    q = reduction
 
     # Do t=confidence miller-rabin test
     for _ in range(confidence):
@@ -229,14 +251,17 @@ def miller_rabin(odd_integer: int, confidence: int) -> bool:
         # Test
         inconclusive = False
 
-        if pow(base=a, exp=q, mod=odd_integer) == 1:
+        a_power = pow(base=a, exp=q, mod=odd_integer)
+        if a_power == 1:
             inconclusive = True
             continue
 
-        for j in range(k):
-            if (a ** (2**j * q)) % odd_integer == odd_integer - 1:
+        # a^(2^j * q) mod n by repeated modular squaring
+        for _ in range(k):
+            if a_power == odd_integer - 1:
                 inconclusive = True
                 break
+            a_power = a_power * a_power % odd_integer
 
         if not inconclusive:
             return False
@@ -3,19 +3,21 @@ Simon Paquette
 300044038
 CSI 4108
 Assignment 4
-
-Before executing the python file, need to install the Sympy library (https://www.sympy.org/en/index.html):
-    pip install sympy
-    or
-    conda install sympy
 """
 
 import hmac
 import math
 import random
+import secrets
 from hashlib import sha1, sha512
 
-import sympy
+from dsa_parameters import DSAParameters, generate_dsa_parameters
+from modular_exponentiation import (
+    FixedBaseExponentiation,
+    get_fixed_base_exponentiation,
+    multi_exp,
+)
+from presigning import PresignaturePool
 
 #!##################################################################
 #! Q1 - HMAC-SHA-512
@@ -136,6 +138,8 @@ class DSA:
     prime_p_bit_length = 1024
     prime_q_bit_length = 160
     hash_fun = sha1
+    # bits per digit of the precomputed g^k table (memory ~ q_bits/w * 2^w residues), 0 to use pow
+    fixed_base_window = 6
 
     def __init__(
         self,
@@ -145,8 +149,14 @@ class DSA:
         g: int = None,
         x: int = None,
         y: int = None,
+        parameters: DSAParameters = None,
+        window: int = None,
     ):
 
+        # a shared group: many keys can use it without regenerating it
+        if parameters is not None:
+            p, q, g = parameters
+
         if p is None or q is None:
             self.set_primes()
         else:
@@ -154,46 +164,40 @@ class DSA:
             self.q = q
 
         self.h = h
+        self.g = g
+        self.x = x
+        self.y = y
+        self.presigning: PresignaturePool = None
 
         if g is None:
             self.set_generator()
 
+        self.set_fixed_base(DSA.fixed_base_window if window is None else window)
+
         if x is None:
             self.set_private_key()
 
         if y is None:
             self.set_public_key()
 
-    def set_primes(self):
+    @property
+    def parameters(self) -> DSAParameters:
+        """
+        Getter
 
-        # get a list of 160-bits prime to be checked for valid parameters
-        q_list = sympy.primerange(
-            2 ** (DSA.prime_q_bit_length - 1), 2**DSA.prime_q_bit_length
-        )
-
-        for q_tmp in q_list:
+        Returns:
+            DSAParameters: the group (p, q, g) of this key
+        """
+        return DSAParameters(self.p, self.q, self.g)
 
-            # get a random p value of 1024 bits from a random q
-            # HERE: get a value where q divide p-1
-            # easier to do this way, instead of trying to find a q that divide p-1
-            p_tmp = q_tmp * 2 ** (DSA.prime_p_bit_length - DSA.prime_q_bit_length) + 1
-
-            # test that p is prime
-            if not sympy.isprime(p_tmp):
-                continue
-
-            # HERE: test that q^2 does not divide p-1
-            if (p_tmp - 1) % (q_tmp**2) == 0:
-                continue
-
-            # if the code run this, that means the previous condition were passed
-            # and that we correctly identify prime p and prime q
-            p = p_tmp
-            q = q_tmp
-            break
+    def set_primes(self):
 
-        self.p = p
-        self.q = q
+        # random q, then p = 2mq + 1 searched in sieved windows of m
+        parameters = generate_dsa_parameters(
+            DSA.prime_p_bit_length, DSA.prime_q_bit_length
+        )
+        self.p = parameters.p
+        self.q = parameters.q
 
     def set_generator(self):
 
@@ -206,6 +210,38 @@ class DSA:
             g = pow(base=self.h, exp=(self.p - 1) // self.q, mod=self.p)
         self.g = g
 
+    def set_fixed_base(self, window: int):
+
+        # precompute g^(d * 2^(w*i)) once per group, every g^k is then one product per w-bit
+        # digit: the keys of a shared group share the cached table
+        self.g_power: FixedBaseExponentiation = None
+        if window:
+            self.g_power = get_fixed_base_exponentiation(
+                self.g, self.p, self.q.bit_length(), window
+            )
+
+    def pow_g(self, exponent: int) -> int:
+
+        if self.g_power is None:
+            return pow(base=self.g, exp=exponent, mod=self.p)
+        return self.g_power.exp(exponent)
+
+    def start_presigning(self, **kwargs) -> PresignaturePool:
+
+        # sign without nonce then takes (k, g^k, k^-1) from a pool filled in the background,
+        # see PresignaturePool for the options (high_water, low_water, batch_size, process)
+        self.stop_presigning()
+        kwargs.setdefault("window", self.g_power.window if self.g_power else 6)
+        self.presigning = PresignaturePool(self.g, self.p, self.q, **kwargs)
+        self.presigning.start()
+        return self.presigning
+
+    def stop_presigning(self):
+
+        if self.presigning is not None:
+            self.presigning.close()
+        self.presigning = None
+
     def set_private_key(self):
 
         self.x = random.randint(2, self.q - 1)
@@ -213,28 +249,40 @@ class DSA:
     def set_public_key(self):
 
         # set public key as y = g^x mod p
-        self.y = pow(base=self.g, exp=self.x, mod=self.p)
+        self.y = self.pow_g(self.x)
 
     def sign(self, message: int, k: int = None) -> tuple[int, int]:
 
+        r, s, _ = self.sign_full(message, k)
+
+        # generate signature
+        return (r, s)
+
+    def sign_full(self, message: int, k: int = None) -> tuple[int, int, int]:
+
+        # signature (r, s) along with the commitment R = g^k mod p (r = R mod q),
+        # verifiers that receive R can check many signatures at once (verify_batch)
         if k is not None:
             assert k > 1 and k < self.q - 1
+            big_r, k_inv = self.pow_g(k), pow(k, -1, self.q)
+        elif self.presigning is not None:
+            # precomputed offline, only the hash and a few products mod q are left
+            k, big_r, k_inv = self.presigning.take()
         else:
             k = random.randint(2, self.q - 1)
+            big_r, k_inv = self.pow_g(k), pow(k, -1, self.q)
 
         # calculate r = (g^k mod p) mod q
-        r = pow(base=self.g, exp=k, mod=self.p) % self.q
+        r = big_r % self.q
 
         # calculate s = ([H(m) +xr] k^-1) mod q
         inner_hash = DSA.hash_fun(to_bytes(message)).digest()
         xr = self.x * r
-        k_inv = pow(k, -1, self.q)
         concat = to_int(inner_hash) + (xr)
         mult = concat * k_inv
         s = mult % self.q
 
-        # generate signature
-        return (r, s)
+        return (r, s, big_r)
 
     def verify(self, signature: tuple[int, int], message: int) -> bool:
 
@@ -246,13 +294,72 @@ class DSA:
         u1 = (hash_m * s_inv) % self.q
         u2 = (r * s_inv) % self.q
 
-        # validation step
-        g_u1 = pow(self.g, u1, self.p)
-        y_u2 = pow(self.y, u2, self.p)
-        validation = ((g_u1 * y_u2) % self.p) % self.q
+        # validation step, g^u1 * y^u2 mod p in a single pass sharing the squarings
+        g_u1_y_u2 = multi_exp((self.g, self.y), (u1, u2), self.p)
+        validation = g_u1_y_u2 % self.q
 
         return validation == r
 
+    def verify_batch(
+        self, items, security: int = 64, min_batch: int = 4
+    ) -> list[bool]:
+        """
+        verify many signatures of this key with the randomized small-exponent test:
+        a signature (r, s, R) is valid iff R = g^u1 * y^u2, so with random c_i of
+        security bits, prod(R_i^c_i) = g^sum(c_i*u1_i) * y^sum(c_i*u2_i) holds for a
+        batch containing an invalid signature with probability at most 2^-security.
+        A failing batch is bisected, with fresh exponents, down to min_batch items
+        which are verified one by one.
+
+        Plain signatures (r, s) do not carry R (it cannot be recovered from r = R mod q),
+        they are verified one by one. The test assumes every R lies in the subgroup of
+        order q, as produced by sign_full.
+
+        Args:
+            items (iterable): (signature, message) pairs, signature being (r, s, R) or (r, s)
+            security (int, optional): size of the random exponents in bits. Defaults to 64.
+            min_batch (int, optional): size under which a batch is verified one by one. Defaults to 4.
+
+        Returns:
+            list[bool]: validity of every signature, in order
+        """
+        items = list(items)
+        results = [False] * len(items)
+        batch = []
+        for index, (signature, message) in enumerate(items):
+            r, s = signature[:2]
+            if not (0 < r < self.q and 0 < s < self.q):
+                continue
+            if len(signature) < 3:
+                results[index] = self.verify((r, s), message)
+                continue
+            big_r = signature[2]
+            if not (0 < big_r < self.p and big_r % self.q == r):
+                continue
+            s_inv = pow(s, -1, self.q)
+            hash_m = to_int(DSA.hash_fun(to_bytes(message)).digest())
+            batch.append((index, big_r, hash_m * s_inv % self.q, r * s_inv % self.q))
+
+        pending = [batch]
+        while pending:
+            batch = pending.pop()
+            if len(batch) < min_batch:
+                for index, big_r, u1, u2 in batch:
+                    results[index] = multi_exp((self.g, self.y), (u1, u2), self.p) == big_r
+                continue
+            # secret exponents: an adversary must not be able to cancel its forgeries
+            exponents = [secrets.randbits(security) | 1 for _ in batch]
+            left = multi_exp((big_r for _, big_r, _, _ in batch), exponents, self.p)
+            e1 = sum(c * u1 for c, (_, _, u1, _) in zip(exponents, batch)) % self.q
+            e2 = sum(c * u2 for c, (_, _, _, u2) in zip(exponents, batch)) % self.q
+            if left == multi_exp((self.g, self.y), (e1, e2), self.p):
+                for index, _, _, _ in batch:
+                    results[index] = True
+            else:
+                half = len(batch) // 2
+                pending += [batch[:half], batch[half:]]
+        return results
+
 
 # Define param
 m = 522346828557612
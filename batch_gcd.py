@@ -0,0 +1,268 @@
+"""
+Batch GCD (Bernstein): find the RSA moduli sharing a prime with another modulus of a corpus
+with a product tree and a remainder tree instead of pairwise gcds, and rebuild the private keys
+of the broken moduli. The scan is quasi-linear with gmpy2: the top of the trees holds integers
+the size of the whole corpus, whose products and divisions are quadratic with Python ints
+"""
+
+import math
+from functools import partial
+from operator import mul
+
+from primality import is_probable_prime
+from public_key import RSA
+
+# levels smaller than this are computed in this process, the transfers would cost more
+POOL_MIN_LEVEL = 64
+
+
+def _bignum():
+    """
+    integer type of the trees: gmpy2.mpz when installed, CPython's division being quadratic
+    in the size of the operands, which dominates the top levels of the remainder trees
+
+    Returns:
+        type: gmpy2.mpz or int
+    """
+    try:
+        from gmpy2 import mpz
+    except ImportError:
+        return int
+    return mpz
+
+
+def read_moduli(path: str):
+    """
+    lazily read a corpus of moduli, one decimal or 0x-prefixed hexadecimal integer per line,
+    skipping blank lines and # comments
+
+    Args:
+        path (str): text file
+
+    Yields:
+        int: moduli, in file order
+    """
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                yield int(line, 0)
+
+
+def _chunks(moduli, chunk_size: int):
+    """
+    split an iterable in lists of chunk_size items
+
+    Args:
+        moduli (iterable): integers
+        chunk_size (int): items per chunk
+
+    Yields:
+        list[int]: chunks, the last one possibly shorter
+    """
+    chunk = []
+    for modulus in moduli:
+        chunk.append(modulus)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _map(executor, function, *iterables) -> list:
+    """
+    map a function on a process pool when the level is large enough
+
+    Args:
+        executor (Executor): pool, None to run in this process
+        function (callable): picklable function
+        iterables (list): arguments
+
+    Returns:
+        list: results, in order
+    """
+    size = len(iterables[0])
+    if executor is None or size < POOL_MIN_LEVEL:
+        return list(map(function, *iterables))
+    return list(executor.map(function, *iterables, chunksize=max(1, size // 64)))
+
+
+def _remainder(value: int, modulus: int) -> int:
+    return value % modulus
+
+
+def _square_remainder(value: int, modulus: int) -> int:
+    return value % (modulus * modulus)
+
+
+def product_tree(numbers: list[int], executor=None) -> list[list[int]]:
+    """
+    product tree: each level holds the products of pairs of the level below
+
+    Args:
+        numbers (list[int]): leaves
+        executor (Executor, optional): pool computing the products of a level. Defaults to None.
+
+    Returns:
+        list[list[int]]: levels, from the leaves to the root [prod(numbers)]
+    """
+    assert numbers
+    tree = [list(map(_bignum(), numbers))]
+    while len(tree[-1]) > 1:
+        level = tree[-1]
+        products = _map(executor, mul, level[0::2], level[1::2])
+        if len(level) % 2:
+            products.append(level[-1])
+        tree.append(products)
+    return tree
+
+
+def remainder_tree(tree: list[list[int]], value: int, square: bool = False, executor=None) -> list[int]:
+    """
+    reduce a value modulo every leaf of a product tree, from the root down
+
+    Args:
+        tree (list[list[int]]): product tree
+        value (int): value to reduce
+        square (bool, optional): reduce modulo the squares of the nodes. Defaults to False.
+        executor (Executor, optional): pool computing the remainders of a level. Defaults to None.
+
+    Returns:
+        list[int]: value mod leaf (or leaf^2), one per leaf
+    """
+    function = _square_remainder if square else _remainder
+    remainders = [function(value, tree[-1][0])]
+    for level in reversed(tree[:-1]):
+        parents = [remainders[i // 2] for i in range(len(level))]
+        remainders = _map(executor, function, parents, level)
+    return remainders
+
+
+def batch_gcd(moduli: list[int], executor=None) -> list[int]:
+    """
+    gcd of every modulus with the product of all the others:
+    with P the product of the moduli, gcd(n, P / n) = gcd(n, (P mod n^2) / n)
+
+    Args:
+        moduli (list[int]): moduli
+        executor (Executor, optional): pool computing the tree levels. Defaults to None.
+
+    Returns:
+        list[int]: one gcd per modulus, 1 when it shares nothing
+    """
+    tree = product_tree(moduli, executor)
+    return _chunk_gcd(tree, tree[-1][0], executor)
+
+
+def _chunk_gcd(tree: list[list[int]], value: int, executor) -> list[int]:
+    """
+    gcd of every modulus of a chunk with the product P of the whole corpus: the chunk product R
+    is a multiple of every n^2 of the chunk, so P mod R^2 reduced down the tree of the chunk
+    gives P mod n^2 at every leaf
+
+    Args:
+        tree (list[list[int]]): product tree of the chunk
+        value (int): P mod R^2
+        executor (Executor): pool computing the tree levels, or None
+
+    Returns:
+        list[int]: one gcd per modulus of the chunk
+    """
+    remainders = remainder_tree(tree, value, square=True, executor=executor)
+    return [int(math.gcd(n, r // n)) for n, r in zip(tree[0], remainders)]
+
+
+def shared_factors(moduli, chunk_size: int = 1 << 10, processes: int = 1):
+    """
+    scan a corpus for the moduli sharing a factor with another one, in two passes over the
+    corpus, chunk_size moduli at a time: the first keeps the product of every chunk, a product
+    tree of these products and its remainder tree give P mod R^2 for every chunk product R,
+    the second reduces it down the tree of each chunk. Every chunk product is computed once
+    per pass, and only one chunk tree is held at a time: the memory is dominated by the tree
+    of the chunk products, log2(corpus / chunk_size) times the size of the corpus in bits
+
+    Args:
+        moduli (iterable | str): moduli, or path of a file streamed with read_moduli
+            (any other iterable is first copied in a list, a corpus larger than memory must be a file)
+        chunk_size (int, optional): moduli per tree. Defaults to 1 << 10.
+        processes (int, optional): worker processes for the tree levels, 1 runs in this process, None uses every core. Defaults to 1.
+
+    Yields:
+        tuple[int, int]: (modulus, gcd with the product of the others) when the gcd is not 1
+    """
+    if isinstance(moduli, str):
+        source = partial(read_moduli, moduli)
+    else:
+        source = partial(iter, list(moduli))
+
+    executor = None
+    if processes != 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(max_workers=processes)
+    try:
+        products = [product_tree(chunk, executor)[-1][0] for chunk in _chunks(source(), chunk_size)]
+        if not products:
+            return
+        top = product_tree(products, executor)
+        values = remainder_tree(top, top[-1][0], square=True, executor=executor)
+        del top, products
+        for chunk, value in zip(_chunks(source(), chunk_size), values):
+            for n, divisor in zip(chunk, _chunk_gcd(product_tree(chunk, executor), value, executor)):
+                if divisor != 1:
+                    yield (n, divisor)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def split_shared(found: list[tuple[int, int]]) -> dict[int, int]:
+    """
+    a prime factor of every modulus found: when the gcd is the modulus itself (both primes
+    shared, or a duplicated modulus), the modulus is split by pairwise gcds with the other
+    moduli found, which are few
+
+    Args:
+        found (list[tuple[int, int]]): (modulus, gcd) pairs from shared_factors
+
+    Returns:
+        dict[int, int]: {modulus: non-trivial factor}, duplicated moduli that no gcd splits are left out
+    """
+    factors = {}
+    moduli = [n for n, _ in found]
+    for n, divisor in found:
+        if divisor != n:
+            factors[n] = divisor
+            continue
+        for other in moduli:
+            divisor = math.gcd(n, other)
+            if 1 < divisor < n:
+                factors[n] = divisor
+                break
+    return factors
+
+
+def recover_keys(factors: dict[int, int], public_key_e: int = 65537) -> list[RSA]:
+    """
+    rebuild the RSA keys of the broken moduli
+
+    Args:
+        factors (dict[int, int]): {modulus: non-trivial factor}, see split_shared
+        public_key_e (int, optional): public exponent of the moduli. Defaults to 65537.
+
+    Returns:
+        list[RSA]: keys with the recovered primes and private key, for the moduli whose
+            factors are prime and whose phi is coprime to e
+    """
+    keys = []
+    for n, prime_p in factors.items():
+        prime_q = n // prime_p
+        if not (is_probable_prime(prime_p) and is_probable_prime(prime_q)):
+            continue
+        if prime_p == prime_q or math.gcd(public_key_e, (prime_p - 1) * (prime_q - 1)) != 1:
+            continue
+        rsa = RSA(prime_p=prime_p, prime_q=prime_q)
+        rsa.set_keys(public_key_e)
+        keys.append(rsa)
+    return keys
@@ -0,0 +1,362 @@
+"""
+Benchmarks of the toolbox
+
+Run every benchmark, or only some of them:
+    python benchmark.py
+    python benchmark.py import_time
+"""
+
+import contextlib
+import io
+import random
+import subprocess
+import sys
+import time
+
+#!##################################################################
+#! IMPORT TIME
+#!##################################################################
+
+# modules imported by short-lived workers, and the time they may take (ms)
+IMPORT_BUDGET_MS = {
+    "utils": 100,
+    "arithmetic": 100,
+    "finite_field": 100,
+    "public_key": 100,
+    "crypto_tbx": 150,
+}
+
+# optional dependencies that must only be imported by the code paths using them
+HEAVY_MODULES = ("numpy", "pandas", "sympy", "cryptography", "concurrent.futures")
+
+
+def import_time(module: str, repeat: int = 5) -> float:
+    """
+    best cumulative import time of a module in a fresh interpreter
+
+    Args:
+        module (str): module name
+        repeat (int, optional): number of interpreters started. Defaults to 5.
+
+    Returns:
+        float: import time in ms
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stderr
+        for line in output.splitlines():
+            _, cumulative, name = line.split("|")
+            if name.strip() == module:
+                best = min(best, int(cumulative) / 1000)
+    return best
+
+
+def heavy_imports(module: str) -> list[str]:
+    """
+    heavy dependencies loaded as a side effect of importing a module
+
+    Args:
+        module (str): module name
+
+    Returns:
+        list[str]: names from HEAVY_MODULES found in sys.modules
+    """
+    code = f"import sys, {module}; print(' '.join(m for m in {HEAVY_MODULES} if m in sys.modules))"
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    return output.split()
+
+
+def bench_import_time() -> None:
+    """
+    guard against import time regressions
+
+    Raises:
+        AssertionError: a module is over budget or loads a heavy dependency
+    """
+    regressions = []
+    for module, budget in IMPORT_BUDGET_MS.items():
+        elapsed = import_time(module)
+        heavy = heavy_imports(module)
+        print(f"import {module:<14} {elapsed:>8.1f} ms (budget {budget} ms) {' '.join(heavy)}")
+        if elapsed > budget:
+            regressions.append(f"{module} takes {elapsed:.1f} ms > {budget} ms")
+        if heavy:
+            regressions.append(f"{module} imports {', '.join(heavy)}")
+    assert not regressions, "\n".join(regressions)
+
+
+#!##################################################################
+#! DSA BATCH VERIFICATION
+#!##################################################################
+
+
+def bench_dsa_verify_batch(count: int = 2000, invalid: int = 20) -> None:
+    """
+    DSA.verify_batch against a loop of DSA.verify, on valid batches and with a few forgeries
+
+    Args:
+        count (int, optional): number of signatures. Defaults to 2000.
+        invalid (int, optional): number of signatures of the wrong message. Defaults to 20.
+
+    Raises:
+        AssertionError: the batch and the loop disagree
+    """
+    # the assignment runs its questions on import
+    with contextlib.redirect_stdout(io.StringIO()):
+        from assignment4 import DSA
+
+    dsa = DSA()
+    messages = [random.getrandbits(128) for _ in range(count)]
+    items = [(dsa.sign_full(message), message) for message in messages]
+    forged = list(items)
+    for index in random.sample(range(count), invalid):
+        signature, message = forged[index]
+        forged[index] = (signature, message + 1)
+
+    print(f"p {dsa.p.bit_length()} bits, q {dsa.q.bit_length()} bits, {count} signatures")
+    for name, batch in (("valid", items), (f"{invalid} invalid", forged)):
+        start = time.perf_counter()
+        expected = [dsa.verify(signature[:2], message) for signature, message in batch]
+        loop = time.perf_counter() - start
+        start = time.perf_counter()
+        results = dsa.verify_batch(batch)
+        batched = time.perf_counter() - start
+        assert results == expected
+        print(
+            f"{name:<12} verify {count / loop:>8.0f}/s   "
+            f"verify_batch {count / batched:>8.0f}/s   x{loop / batched:.1f}"
+        )
+
+
+#!##################################################################
+#! RSA KEY GENERATION
+#!##################################################################
+
+
+def bench_rsa_keygen(sizes: tuple = (1024, 2048, 3072, 4096), repeat: int = 3) -> None:
+    """
+    time of RSA.generate per modulus size
+
+    Args:
+        sizes (tuple, optional): modulus sizes in bits. Defaults to (1024, 2048, 3072, 4096).
+        repeat (int, optional): keys generated per size. Defaults to 3.
+
+    Raises:
+        AssertionError: a key does not decrypt what it encrypts
+    """
+    from public_key import RSA
+
+    for bits in sizes:
+        elapsed = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            rsa = RSA.generate(bits)
+            elapsed.append(time.perf_counter() - start)
+            message = random.randrange(2, rsa.phi)
+            assert rsa.pq.bit_length() == bits
+            assert rsa.decrypt(rsa.encrypt(message)) == message
+        print(
+            f"RSA-{bits:<5} mean {sum(elapsed) / repeat:>7.2f} s   "
+            f"min {min(elapsed):>7.2f} s   max {max(elapsed):>7.2f} s"
+        )
+
+
+#!##################################################################
+#! RSA-OAEP THROUGHPUT
+#!##################################################################
+
+
+def _throughput(function, data: bytes) -> tuple[bytes, float]:
+    """
+    run a bytes-to-bytes function once
+
+    Args:
+        function (callable): encryption or decryption
+        data (bytes): input
+
+    Returns:
+        tuple[bytes, float]: output, and input size per second in MB/s
+    """
+    start = time.perf_counter()
+    output = function(data)
+    return (output, len(data) / (time.perf_counter() - start) / 1e6)
+
+
+def bench_rsa_oaep(size: int = 1 << 15, bits: int = 2048) -> None:
+    """
+    RSA-OAEP (SHA-256) throughput of RSA.encrypt_bytes / decrypt_bytes, and of the
+    cryptography library calls timed in assignment3 when it is installed, on the same key
+
+    Args:
+        size (int, optional): plaintext size in bytes. Defaults to 1 << 15.
+        bits (int, optional): modulus size. Defaults to 2048.
+
+    Raises:
+        AssertionError: a decryption does not give the plaintext back
+    """
+    import os
+
+    from public_key import RSA
+
+    rsa = RSA.generate(bits)
+    data = os.urandom(size)
+    ciphertext, encrypt_speed = _throughput(rsa.encrypt_bytes, data)
+    plaintext, decrypt_speed = _throughput(rsa.decrypt_bytes, ciphertext)
+    assert plaintext == data
+    print(f"RSA-{bits} OAEP, {size} bytes")
+    print(f"public_key    encrypt {encrypt_speed:>8.3f} MB/s   decrypt {decrypt_speed:>8.3f} MB/s")
+
+    try:
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import padding
+        from cryptography.hazmat.primitives.asymmetric import rsa as crypto_rsa
+    except ImportError:
+        print("cryptography  not installed")
+        return
+
+    p, q, d = rsa.prime_p, rsa.prime_q, rsa.private_key_d
+    private_key = crypto_rsa.RSAPrivateNumbers(
+        p, q, d, d % (p - 1), d % (q - 1), pow(q, -1, p),
+        crypto_rsa.RSAPublicNumbers(rsa.public_key_e, rsa.pq),
+    ).private_key()
+    public_key = private_key.public_key()
+    oaep = padding.OAEP(
+        mgf=padding.MGF1(algorithm=hashes.SHA256()), algorithm=hashes.SHA256(), label=None
+    )
+    k = rsa.byte_length()
+    block = k - 2 * 32 - 2
+
+    def encrypt(data: bytes) -> bytes:
+        return b"".join(
+            public_key.encrypt(data[i : i + block], oaep) for i in range(0, len(data), block)
+        )
+
+    def decrypt(data: bytes) -> bytes:
+        return b"".join(private_key.decrypt(data[i : i + k], oaep) for i in range(0, len(data), k))
+
+    ciphertext, encrypt_speed = _throughput(encrypt, data)
+    plaintext, decrypt_speed = _throughput(decrypt, ciphertext)
+    assert plaintext == data
+    # both implementations follow RFC 8017, they decrypt each other
+    assert rsa.decrypt_bytes(ciphertext) == data
+    print(f"cryptography  encrypt {encrypt_speed:>8.3f} MB/s   decrypt {decrypt_speed:>8.3f} MB/s")
+
+
+#!##################################################################
+#! ECC SCALAR MULTIPLICATION
+#!##################################################################
+
+# NIST P-256 (FIPS 186-4, D.1.2.3)
+P256_PRIME = 2**256 - 2**224 + 2**192 + 2**96 - 1
+P256_B = 0x5AC635D8AA3A93E7B3EBBD55769886BC651D06B0CC53B0F63BCE3C3E27D2604B
+P256_G = (
+    0x6B17D1F2E12C4247F8BCE6E563A440F277037D812DEB33A0F4A13945D898C296,
+    0x4FE342E2FE1A7F9B8EE7EB4A7C0F9E162BCE33576B315ECECBB6406837BF51F5,
+)
+P256_ORDER = 0xFFFFFFFF00000000FFFFFFFFFFFFFFFFBCE6FAADA7179E84F3B9CAC2FC632551
+
+
+def bench_ecc_multiplication(count: int = 200) -> None:
+    """
+    k*P on P-256 with 256-bit scalars, for every method of ECurve_GFP.multiplication
+    and for the fixed-base tables of the generator
+
+    Args:
+        count (int, optional): scalars per method. Defaults to 200.
+
+    Raises:
+        AssertionError: the methods disagree
+    """
+    from public_key import ECurve_GFP, FixedBasePoint
+
+    curve = ECurve_GFP(P256_PRIME, -3, P256_B)
+    scalars = [random.randrange(1, P256_ORDER) for _ in range(count)]
+    reference = None
+    for method, window in (("double_and_add", 4), ("ladder", 4), ("wnaf", 4), ("wnaf", 5)):
+        start = time.perf_counter()
+        points = [curve.multiplication(k, *P256_G, method=method, window=window) for k in scalars]
+        elapsed = (time.perf_counter() - start) / count
+        reference = reference or points
+        assert points == reference
+        name = f"{method} w={window}" if method == "wnaf" else method
+        print(f"P-256 {name:<16} {elapsed * 1000:>7.2f} ms   {1 / elapsed:>7.0f} k*P/s")
+
+    # generator multiples precomputed once, as for ECC keys and encryptions
+    for window in (4, 6, 8):
+        start = time.perf_counter()
+        table = FixedBasePoint(curve, *P256_G, window=window)
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        points = [table.multiplication(k) for k in scalars]
+        elapsed = (time.perf_counter() - start) / count
+        assert points == reference
+        name = f"fixed base w={window}"
+        print(
+            f"P-256 {name:<16} {elapsed * 1000:>7.2f} ms   {1 / elapsed:>7.0f} k*G/s   "
+            f"(table {sum(map(len, table.table))} points, built in {build:.2f} s)"
+        )
+
+
+def bench_curve_points(primes: tuple = (1009, 65537, 1000003), brute_force_max: int = 2000) -> None:
+    """
+    enumeration of the points of y^2 = x^3 - 3x + 7 over GF(p): one square root per x with
+    ECurve_GFP.iter_points and the NumPy square-root table, against the p^2 is_point scan
+    of ECurve.list_point on the small fields
+
+    Args:
+        primes (tuple, optional): field sizes. Defaults to (1009, 65537, 1000003).
+        brute_force_max (int, optional): largest p scanned pairwise. Defaults to 2000.
+
+    Raises:
+        AssertionError: the enumerations disagree
+    """
+    from public_key import ECurve, ECurve_GFP
+
+    for p in primes:
+        curve = ECurve_GFP(p, -3, 7)
+        start = time.perf_counter()
+        points = curve.list_point()
+        lazy = time.perf_counter() - start
+        row = f"p={p:<9} {len(points) + 1:>8} points   iter {lazy:>7.3f} s"
+        try:
+            start = time.perf_counter()
+            array = curve.points_array()
+            vectorized = time.perf_counter() - start
+        except ImportError:
+            pass
+        else:
+            assert array.tolist() == [list(point) for point in points]
+            row += f"   numpy {vectorized:>7.3f} s"
+        if p <= brute_force_max:
+            start = time.perf_counter()
+            assert ECurve.list_point(curve) == points
+            row += f"   p^2 scan {time.perf_counter() - start:>7.3f} s"
+        print(row)
+
+
+BENCHMARKS = {
+    "import_time": bench_import_time,
+    "dsa_verify_batch": bench_dsa_verify_batch,
+    "rsa_keygen": bench_rsa_keygen,
+    "rsa_oaep": bench_rsa_oaep,
+    "ecc_multiplication": bench_ecc_multiplication,
+    "curve_points": bench_curve_points,
+}
+
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or BENCHMARKS:
+        print()
+        print("-" * len(name))
+        print(name)
+        print("-" * len(name))
+        start = time.perf_counter()
+        BENCHMARKS[name]()
+        print(f"({time.perf_counter() - start:.1f} s)")
@@ -7,6 +7,8 @@ import math
 from arithmetic import NumeralArithmetic, PolynomialArithmetic
 from finite_field import FiniteField
 from PRNG import BBS, LCG
+from prime_generator import generate_prime, generate_primes
+from primitive_root import first_primitive_root
 from public_key import ECC, RSA, ECurve_GF2, ECurve_GFP
 from stream_cipher import caesar, vigenere, xor
 from utils import (
@@ -51,6 +53,8 @@ from utils import (
 # integer, binary = get_n_bit_odd_number(14)
 # probable_prime = miller_rabin(integer, 5)
 # print(integer, probable_prime)
+# print(generate_prime(1024))
+# print(generate_primes(1024, 8, processes=4))
 
 # ? Polynomial operator
 # FIELD = 2
@@ -79,7 +83,8 @@ from utils import (
 # print(NumeralArithmetic.from_tuple_repr(30, [0, 2, 4]))
 
 # ? Primitive roots
-# primitive_roots(25)
+# primitive_roots(25, table=True)
+# print(first_primitive_root(2**61 - 1))
 
 
 #!##################################################################
@@ -120,7 +125,7 @@ from utils import (
 # ? RSA
 # rsa = RSA(prime_p=17, prime_q=11, public_key_e=7, private_key_d=23)
 # c = rsa.encrypt(88)
-# rsa.decrypt_CRT(c)
+# m = rsa.decrypt_CRT(c, pprint=True)
 
 # rsa = RSA(prime_p=7, prime_q=997)
 # rsa.set_keys(5971)
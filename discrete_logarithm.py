@@ -0,0 +1,508 @@
+"""
+Discrete logarithm solver: Pohlig-Hellman over the factored order of the base,
+baby-step giant-step or Pollard rho in each prime-order subgroup and CRT recombination
+"""
+
+import math
+import random
+from functools import lru_cache
+
+from factorization import factorize
+
+# prime subgroups up to this order are solved with baby-step giant-step,
+# larger ones with Pollard rho in constant memory
+BSGS_MAX_ORDER = 1 << 32
+
+# baby-step tables kept by get_baby_step_table, each one up to its memory budget
+BABY_STEP_TABLES_CACHED = 4
+
+
+def crt(residues: list[int], moduli: list[int]) -> int:
+    """
+    chinese remainder theorem for pairwise coprime moduli
+
+    Args:
+        residues (list[int]): x mod m_i
+        moduli (list[int]): the m_i
+
+    Returns:
+        int: x mod prod(m_i), the smallest non-negative solution
+    """
+    x, modulus = 0, 1
+    for residue, m in zip(residues, moduli):
+        # x + modulus * t = residue (mod m)
+        t = (residue - x) * pow(modulus, -1, m) % m
+        x += modulus * t
+        modulus *= m
+    return x % modulus
+
+
+def carmichael_factors(modulo: int) -> dict[int, int]:
+    """
+    factorization of the carmichael function lambda(n), the exponent of (Z/nZ)*
+
+    Args:
+        modulo (int): n > 1
+
+    Returns:
+        dict[int, int]: {prime: multiplicity} of lambda(n)
+    """
+    factors = {}
+
+    def merge(prime: int, power: int) -> None:
+        factors[prime] = max(factors.get(prime, 0), power)
+
+    for p, k in factorize(modulo).items():
+        if p == 2:
+            if k > 1:
+                merge(2, k - 2 if k > 2 else 1)
+            continue
+        if k > 1:
+            merge(p, k - 1)
+        for q, e in factorize(p - 1).items():
+            merge(q, e)
+    return {p: e for p, e in sorted(factors.items()) if e > 0}
+
+
+def multiplicative_order(base: int, modulo: int, exponent_factors: dict = None) -> tuple[int, dict]:
+    """
+    order of base in (Z/nZ)*
+
+    Args:
+        base (int): unit modulo n
+        modulo (int): n > 1
+        exponent_factors (dict, optional): factorization of a multiple of the order. Defaults to lambda(n).
+
+    Returns:
+        tuple[int, dict]: the order and its factorization {prime: multiplicity}
+    """
+    assert math.gcd(base, modulo) == 1
+    if exponent_factors is None:
+        exponent_factors = carmichael_factors(modulo)
+
+    order = math.prod(p**e for p, e in exponent_factors.items())
+    order_factors = {}
+    for p, e in exponent_factors.items():
+        order //= p**e
+        # smallest power of p that still sends base to 1
+        g = pow(base, order, modulo)
+        k = 0
+        while g != 1:
+            g = pow(g, p, modulo)
+            k += 1
+        order *= p**k
+        if k:
+            order_factors[p] = k
+    return order, order_factors
+
+
+def bsgs(base: int, value: int, modulo: int, order: int):
+    """
+    baby-step giant-step in the cyclic group of the given order
+
+    Args:
+        base (int): generator of the subgroup
+        value (int): element of the subgroup
+        modulo (int): n
+        order (int): order of base
+
+    Returns:
+        int | None: x in [0, order) with base^x = value
+    """
+    m = math.isqrt(order - 1) + 1
+    baby_steps = {}
+    baby_step = 1
+    for r in range(m):
+        baby_steps.setdefault(baby_step, r)
+        baby_step = baby_step * base % modulo
+
+    giant_stride = pow(base, -m, modulo)
+    giant_step = value
+    for q in range(m):
+        r = baby_steps.get(giant_step)
+        if r is not None:
+            return (q * m + r) % order
+        giant_step = giant_step * giant_stride % modulo
+    return None
+
+
+class BabyStepTable:
+    """
+    Baby-step table of base^r mod n for r < steps, stored in two NumPy uint64 arrays
+    with open addressing (linear probing), so that it can be memory-mapped from disk
+    and shared by every logarithm query against the same (base, modulo)
+    """
+
+    # load factor of the hash table and bytes used by one slot (key + exponent)
+    LOAD_FACTOR = 0.5
+    SLOT_BYTES = 16
+    EMPTY = (1 << 64) - 1
+    _MULTIPLIER = 0x9E3779B97F4A7C15
+    _MASK = (1 << 64) - 1
+
+    def __init__(
+        self,
+        base: int,
+        modulo: int,
+        order: int = None,
+        memory_budget: int = 1 << 28,
+        batch_size: int = 1 << 14,
+    ):
+        """
+        compute the baby steps and fill the table
+
+        Args:
+            base (int): log base, unit modulo n
+            modulo (int): n
+            order (int, optional): order of base. Defaults to its multiplicative order.
+            memory_budget (int, optional): bytes allowed for the table. Defaults to 256 MiB.
+            batch_size (int, optional): giant steps looked up at once. Defaults to 2^14.
+        """
+        import numpy as np
+
+        self.base = base % modulo
+        self.modulo = modulo
+        self.order = order or multiplicative_order(base, modulo)[0]
+        self.batch_size = batch_size
+
+        # as many baby steps as the budget allows, up to sqrt(order)
+        max_steps = int(memory_budget * self.LOAD_FACTOR) // self.SLOT_BYTES
+        self.steps = max(1, min(math.isqrt(self.order - 1) + 1, max_steps))
+        slots = 1 << max(1, math.ceil(self.steps / self.LOAD_FACTOR - 1).bit_length())
+
+        self.keys = np.zeros(slots, dtype=np.uint64)
+        self.values = np.full(slots, self.EMPTY, dtype=np.uint64)
+
+        # inserted batch by batch: a list of every step would hold boxed ints of several times
+        # the budget, and the insertion temporaries stay the size of a batch
+        baby_step = 1
+        for start in range(0, self.steps, batch_size):
+            batch = []
+            for _ in range(min(batch_size, self.steps - start)):
+                batch.append(baby_step & self._MASK)
+                baby_step = baby_step * self.base % modulo
+            stop = start + len(batch)
+            self._insert(np.array(batch, dtype=np.uint64), np.arange(start, stop, dtype=np.uint64))
+
+    def __repr__(self) -> str:
+        """
+        printable representation of the table
+
+        Returns:
+            str: table parameters
+        """
+        return f"BabyStepTable(base={self.base}, modulo={self.modulo}, order={self.order}, steps={self.steps})"
+
+    @property
+    def giant_steps(self) -> int:
+        """
+        number of giant steps needed to cover the whole order
+
+        Returns:
+            int: ceil(order / steps)
+        """
+        return -(-self.order // self.steps)
+
+    def _slots(self, keys):
+        """
+        home slot of each key (fibonacci hashing)
+
+        Args:
+            keys (np.ndarray): uint64 keys
+
+        Returns:
+            np.ndarray: slot indexes
+        """
+        import numpy as np
+
+        shift = np.uint64(64 - (len(self.keys).bit_length() - 1))
+        return ((keys * np.uint64(self._MULTIPLIER)) >> shift).astype(np.int64)
+
+    def _insert(self, keys, values) -> None:
+        """
+        vectorized linear probing insertion, the smallest exponent wins on equal keys
+
+        Args:
+            keys (np.ndarray): uint64 keys
+            values (np.ndarray): uint64 exponents, in increasing order
+        """
+        import numpy as np
+
+        mask = len(self.keys) - 1
+        slots = self._slots(keys)
+        while len(keys):
+            free = np.flatnonzero(self.values[slots] == np.uint64(self.EMPTY))
+            _, first = np.unique(slots[free], return_index=True)
+            chosen = free[first]
+            self.keys[slots[chosen]] = keys[chosen]
+            self.values[slots[chosen]] = values[chosen]
+
+            pending = np.ones(len(keys), dtype=bool)
+            pending[chosen] = False
+            keys, values = keys[pending], values[pending]
+            slots = (slots[pending] + 1) & mask
+
+    def _lookup(self, keys) -> list[tuple[int, int]]:
+        """
+        vectorized search of a batch of keys
+
+        Args:
+            keys (np.ndarray): uint64 keys
+
+        Returns:
+            list[tuple[int, int]]: (index in keys, exponent) of every matching entry
+        """
+        import numpy as np
+
+        mask = len(self.keys) - 1
+        index = np.arange(len(keys))
+        slots = self._slots(keys)
+        matches = []
+        while len(index):
+            found = self.values[slots]
+            occupied = found != np.uint64(self.EMPTY)
+            hit = occupied & (self.keys[slots] == keys)
+            matches.extend(zip(index[hit].tolist(), found[hit].tolist()))
+            index, keys, slots = index[occupied], keys[occupied], (slots[occupied] + 1) & mask
+        return matches
+
+    def log(self, value: int):
+        """
+        giant steps value * base^(-steps * q) until one lands in the table
+
+        Args:
+            value (int): element to take the logarithm of
+
+        Returns:
+            int | None: smallest x in [0, order) with base^x = value, None if there is none
+        """
+        import numpy as np
+
+        modulo = self.modulo
+        exact = modulo <= self._MASK
+        giant_stride = pow(self.base, -self.steps, modulo)
+        giant_step = value % modulo
+        giant_steps = self.giant_steps
+
+        for start in range(0, giant_steps, self.batch_size):
+            batch = []
+            for _ in range(min(self.batch_size, giant_steps - start)):
+                batch.append(giant_step)
+                giant_step = giant_step * giant_stride % modulo
+
+            keys = np.array([step & self._MASK for step in batch], dtype=np.uint64)
+            for q, r in sorted(self._lookup(keys)):
+                x = (start + q) * self.steps + r
+                # keys are truncated to 64 bits for larger moduli: confirm the hit
+                if exact or pow(self.base, x, modulo) == value % modulo:
+                    return x % self.order
+        return None
+
+    def save(self, path: str) -> None:
+        """
+        write the table as a .npy array (memory-mappable) and its parameters as .json
+
+        Args:
+            path (str): file name without extension
+        """
+        import json
+
+        import numpy as np
+
+        np.save(f"{path}.npy", np.stack([self.keys, self.values], axis=1))
+        with open(f"{path}.json", "w") as f:
+            json.dump(
+                {
+                    "base": str(self.base),
+                    "modulo": str(self.modulo),
+                    "order": str(self.order),
+                    "steps": self.steps,
+                },
+                f,
+            )
+
+    @classmethod
+    def load(cls, path: str, batch_size: int = 1 << 14) -> "BabyStepTable":
+        """
+        memory-map a table saved with BabyStepTable.save, no baby step is recomputed
+
+        Args:
+            path (str): file name without extension
+            batch_size (int, optional): giant steps looked up at once. Defaults to 2^14.
+
+        Returns:
+            BabyStepTable: the table
+        """
+        import json
+
+        import numpy as np
+
+        with open(f"{path}.json") as f:
+            params = json.load(f)
+        table = cls.__new__(cls)
+        table.base = int(params["base"])
+        table.modulo = int(params["modulo"])
+        table.order = int(params["order"])
+        table.steps = params["steps"]
+        table.batch_size = batch_size
+        data = np.load(f"{path}.npy", mmap_mode="r")
+        table.keys, table.values = data[:, 0], data[:, 1]
+        return table
+
+
+@lru_cache(maxsize=BABY_STEP_TABLES_CACHED)
+def _cached_baby_step_table(base: int, modulo: int, **kwargs) -> BabyStepTable:
+    return BabyStepTable(base, modulo, **kwargs)
+
+
+def get_baby_step_table(base: int, modulo: int, **kwargs) -> BabyStepTable:
+    """
+    baby-step table for (base, modulo), built once and kept for the next queries: the
+    BABY_STEP_TABLES_CACHED tables used last are kept, the older ones are released
+
+    Args:
+        base (int): log base
+        modulo (int): mod
+        **kwargs: BabyStepTable options used when the table is built
+
+    Returns:
+        BabyStepTable: the cached table
+    """
+    return _cached_baby_step_table(base % modulo, modulo, **kwargs)
+
+
+def pollard_rho_log(base: int, value: int, modulo: int, order: int):
+    """
+    Pollard rho for logarithms in a subgroup of prime order, constant memory
+    (Floyd cycle detection on a 3-partition walk)
+
+    Args:
+        base (int): generator of the subgroup
+        value (int): element of the subgroup
+        modulo (int): n
+        order (int): prime order of base
+
+    Returns:
+        int | None: x in [0, order) with base^x = value
+    """
+    if value == 1:
+        return 0
+
+    def step(x: int, a: int, b: int) -> tuple[int, int, int]:
+        partition = x % 3
+        if partition == 0:
+            return (x * base % modulo, (a + 1) % order, b)
+        if partition == 1:
+            return (x * x % modulo, 2 * a % order, 2 * b % order)
+        return (x * value % modulo, a, (b + 1) % order)
+
+    for _ in range(16):
+        a, b = random.randrange(order), random.randrange(order)
+        x = pow(base, a, modulo) * pow(value, b, modulo) % modulo
+        X, A, B = x, a, b
+        for _ in range(4 * math.isqrt(order) + 16):
+            x, a, b = step(x, a, b)
+            X, A, B = step(*step(X, A, B))
+            if x == X:
+                break
+        # base^a value^b = base^A value^B  =>  (B - b) x = a - A
+        db = (B - b) % order
+        if x == X and db:
+            return (a - A) * pow(db, -1, order) % order
+    return None
+
+
+def _prime_order_log(base: int, value: int, modulo: int, order: int):
+    if value == 1:
+        return 0
+    if order <= BSGS_MAX_ORDER:
+        return bsgs(base, value, modulo, order)
+    return pollard_rho_log(base, value, modulo, order)
+
+
+def pohlig_hellman(base: int, value: int, modulo: int, order_factors: dict):
+    """
+    reduce the logarithm to the prime-order subgroups of <base>
+
+    Args:
+        base (int): unit modulo n
+        value (int): unit modulo n
+        modulo (int): n
+        order_factors (dict): factorization of the order of base
+
+    Returns:
+        int | None: x modulo the order of base, None if a subgroup log does not exist
+    """
+    order = math.prod(p**e for p, e in order_factors.items())
+    residues, moduli = [], []
+    for p, e in order_factors.items():
+        cofactor = order // p**e
+        g = pow(base, cofactor, modulo)
+        h = pow(value, cofactor, modulo)
+        gamma = pow(g, p ** (e - 1), modulo)
+        g_inv = pow(g, -1, modulo)
+
+        # x = d_0 + d_1 p + ... + d_(e-1) p^(e-1), one digit per subgroup log
+        x = 0
+        for k in range(e):
+            h_k = pow(pow(g_inv, x, modulo) * h % modulo, p ** (e - 1 - k), modulo)
+            digit = _prime_order_log(gamma, h_k, modulo, p)
+            if digit is None:
+                return None
+            x += digit * p**k
+        residues.append(x)
+        moduli.append(p**e)
+    return crt(residues, moduli)
+
+
+def discrete_log(base: int, value: int, modulo: int) -> int:
+    """
+    smallest x >= 0 with base^x = value (mod modulo), for any modulus and any base
+
+    Args:
+        base (int): log base
+        value (int): val
+        modulo (int): mod
+
+    Raises:
+        ValueError: value is not a power of base
+
+    Returns:
+        int: the discrete logarithm
+    """
+    assert modulo > 0
+    base %= modulo
+    value %= modulo
+    if modulo == 1:
+        return 0
+
+    # small exponents first: they cover the non-invertible part of base
+    offset = modulo.bit_length()
+    power = 1
+    for x in range(offset):
+        if power == value:
+            return x
+        power = power * base % modulo
+
+    # base^x = value with x >= offset: divide out the part of modulo shared with base
+    # base^offset * base^y = value  =>  solve in the unit group modulo n / gcd
+    reduced = modulo
+    g = math.gcd(base, reduced)
+    while g > 1:
+        reduced //= g
+        g = math.gcd(base, reduced)
+    if value % math.gcd(modulo, power) != 0:
+        raise ValueError(f"{value} is not a power of {base} modulo {modulo}")
+    if reduced == 1:
+        return offset
+
+    target = value % reduced
+    if math.gcd(target, reduced) != 1:
+        raise ValueError(f"{value} is not a power of {base} modulo {modulo}")
+    target = target * pow(power, -1, reduced) % reduced
+
+    order, order_factors = multiplicative_order(base, reduced)
+    y = pohlig_hellman(base % reduced, target, reduced, order_factors)
+    if y is None or pow(base, offset + y, modulo) != value:
+        raise ValueError(f"{value} is not a power of {base} modulo {modulo}")
+    return offset + y
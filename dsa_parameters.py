@@ -0,0 +1,126 @@
+"""
+DSA domain parameters (p, q, g) in the style of FIPS 186: q is an N-bit prime,
+p an L-bit prime with q | p - 1 and g a generator of the subgroup of order q
+"""
+
+import random
+from typing import NamedTuple
+
+from primality import is_probable_prime
+from prime_generator import generate_prime, pool_search, sieve_window
+
+# (L, N) pairs of FIPS 186-4
+APPROVED_SIZES = ((1024, 160), (2048, 224), (2048, 256), (3072, 256))
+
+
+class DSAParameters(NamedTuple):
+    """
+    Immutable DSA group, shared by every key generated in it
+    """
+
+    p: int
+    q: int
+    g: int
+
+    @property
+    def L(self) -> int:
+        """
+        bit length of p
+
+        Returns:
+            int: L
+        """
+        return self.p.bit_length()
+
+    @property
+    def N(self) -> int:
+        """
+        bit length of q
+
+        Returns:
+            int: N
+        """
+        return self.q.bit_length()
+
+    def is_valid(self) -> bool:
+        """
+        check the relations between p, q and g
+
+        Returns:
+            bool: p and q are primes, q divides p - 1 and g has order q
+        """
+        return (
+            is_probable_prime(self.p)
+            and is_probable_prime(self.q)
+            and (self.p - 1) % self.q == 0
+            and 1 < self.g < self.p
+            and pow(self.g, self.q, self.p) == 1
+        )
+
+
+def search_p(q: int, L: int, width: int = None):
+    """
+    look for a prime p = 2mq + 1 of L bits in one window of m after a random start
+
+    Args:
+        q (int): prime q
+        L (int): bit length of p
+        width (int, optional): number of candidates. Defaults to 4 * L.
+
+    Returns:
+        int | None: the first prime p of the window, None if the window has none
+    """
+    step = 2 * q
+    low = -(-(2 ** (L - 1) - 1) // step)
+    high = (2**L - 2) // step
+    start = random.randint(low, high) * step + 1
+    for i in sieve_window(start, step, width or 4 * L):
+        p = start + i * step
+        if p.bit_length() != L:
+            return None
+        # q^2 must not divide p - 1
+        if (p - 1) % (q * q) != 0 and is_probable_prime(p):
+            return p
+    return None
+
+
+def find_generator(p: int, q: int) -> int:
+    """
+    g = h^((p-1)/q) mod p for the smallest h that gives g > 1
+
+    Args:
+        p (int): prime p
+        q (int): prime q dividing p - 1
+
+    Returns:
+        int: generator of the subgroup of order q
+    """
+    exponent = (p - 1) // q
+    for h in range(2, p - 1):
+        g = pow(h, exponent, p)
+        if g > 1:
+            return g
+    raise ValueError(f"no generator of order {q} modulo {p}")
+
+
+def generate_dsa_parameters(L: int = 2048, N: int = 256, processes: int = 1) -> DSAParameters:
+    """
+    generate a DSA group
+
+    Args:
+        L (int, optional): bit length of p. Defaults to 2048.
+        N (int, optional): bit length of q. Defaults to 256.
+        processes (int, optional): worker processes searching p, 1 runs in this process, None uses every core. Defaults to 1.
+
+    Returns:
+        DSAParameters: the group (p, q, g)
+    """
+    assert 1 < N < L
+    q = generate_prime(N)
+    if processes == 1:
+        p = None
+        while p is None:
+            p = search_p(q, L)
+    else:
+        p = pool_search(search_p, (q, L), 1, processes)[0]
+    return DSAParameters(p, q, find_generator(p, q))
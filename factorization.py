@@ -0,0 +1,441 @@
+"""
+Integer factorization engine: trial division, Pollard p-1, Brent's rho and Lenstra ECM,
+all in exact integer arithmetic
+"""
+
+import math
+import random
+import time
+
+from primality import is_probable_prime
+from sieve import get_sieve
+
+TRIAL_DIVISION_BOUND = 1 << 14
+PM1_BOUND = 20000
+RHO_ITERATIONS = 1 << 16
+# ECM levels (B1, number of curves), B2 = 100 * B1
+ECM_LEVELS = ((2000, 25), (11000, 90), (50000, 300), (250000, 700))
+_ECM_STAGE2_D = 105
+
+_trial_primes = None
+
+
+class FactorizationTimeout(Exception):
+    """
+    The effort budget ran out before the number was fully factored
+    """
+
+    def __init__(self, factors: dict, remaining: list):
+        """
+        keep the partial result
+
+        Args:
+            factors (dict): prime factors found so far {prime: multiplicity}
+            remaining (list): composite cofactors left unfactored
+        """
+        super().__init__(f"factorization incomplete, composite cofactors left: {remaining}")
+        self.factors = factors
+        self.remaining = remaining
+
+
+class _Budget:
+    """
+    Deadline shared by every stage of one factorization
+    """
+
+    def __init__(self, timeout: float = None):
+        """
+        start the clock
+
+        Args:
+            timeout (float, optional): seconds allowed, None for no limit. Defaults to None.
+        """
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+
+    def exhausted(self) -> bool:
+        """
+        check the deadline, called by the stages between two rounds
+
+        Returns:
+            bool: the time allowed is over
+        """
+        return self.deadline is not None and time.monotonic() > self.deadline
+
+
+def _primes(bound: int) -> list[int]:
+    """
+    primes below bound from the shared sieve
+
+    Args:
+        bound (int): exclusive upper bound
+
+    Returns:
+        list[int]: primes in increasing order
+    """
+    return list(get_sieve().primes(bound))
+
+
+def trial_division(n: int, factors: dict) -> int:
+    """
+    divide out every prime below TRIAL_DIVISION_BOUND
+
+    Args:
+        n (int): integer > 0
+        factors (dict): {prime: multiplicity}, updated in place
+
+    Returns:
+        int: the cofactor free of small primes
+    """
+    global _trial_primes
+    if _trial_primes is None:
+        _trial_primes = _primes(TRIAL_DIVISION_BOUND)
+
+    for p in _trial_primes:
+        if p * p > n:
+            break
+        if n % p == 0:
+            count = 0
+            while n % p == 0:
+                n //= p
+                count += 1
+            factors[p] = factors.get(p, 0) + count
+    if 1 < n < TRIAL_DIVISION_BOUND**2:
+        factors[n] = factors.get(n, 0) + 1
+        n = 1
+    return n
+
+
+def perfect_power(n: int):
+    """
+    detect n = r^k
+
+    Args:
+        n (int): integer > 1
+
+    Returns:
+        tuple[int, int] | None: (r, k) with k maximal, None if n is not a perfect power
+    """
+    for k in range(n.bit_length(), 1, -1):
+        r = _iroot(n, k)
+        if r > 1 and r**k == n:
+            return (r, k)
+    return None
+
+
+def _iroot(n: int, k: int) -> int:
+    """
+    floor of the k-th root of n, Newton iteration on integers
+
+    Args:
+        n (int): integer >= 0
+        k (int): root degree
+
+    Returns:
+        int: floor(n^(1/k))
+    """
+    if n < 2:
+        return n
+    x = 1 << -(-n.bit_length() // k)
+    while True:
+        y = ((k - 1) * x + n // x ** (k - 1)) // k
+        if y >= x:
+            return x
+        x = y
+
+
+def pollard_pm1(n: int, bound: int = PM1_BOUND, budget: _Budget = None):
+    """
+    Pollard p-1 (stage 1): finds p when p-1 is bound-powersmooth
+
+    Args:
+        n (int): odd composite
+        bound (int, optional): smoothness bound B1. Defaults to PM1_BOUND.
+        budget (_Budget, optional): deadline. Defaults to None.
+
+    Returns:
+        int | None: a non-trivial factor of n
+    """
+    a = 2
+    for index, p in enumerate(_primes(bound + 1)):
+        q = p
+        while q * p <= bound:
+            q *= p
+        a = pow(a, q, n)
+        if index % 64 == 63:
+            g = math.gcd(a - 1, n)
+            if g == n:
+                return None
+            if g > 1:
+                return g
+            if budget is not None and budget.exhausted():
+                return None
+    g = math.gcd(a - 1, n)
+    return g if 1 < g < n else None
+
+
+def brent_rho(n: int, iterations: int = RHO_ITERATIONS, budget: _Budget = None):
+    """
+    Brent's variant of Pollard rho with f(x) = x^2 + c, gcds batched over m steps
+
+    Args:
+        n (int): odd composite
+        iterations (int, optional): maximum number of steps. Defaults to RHO_ITERATIONS.
+        budget (_Budget, optional): deadline. Defaults to None.
+
+    Returns:
+        int | None: a non-trivial factor of n
+    """
+    y = random.randrange(1, n)
+    c = random.randrange(1, n)
+    m = 128
+    g = r = q = 1
+    steps = 0
+    while g == 1:
+        x = y
+        for _ in range(r):
+            y = (y * y + c) % n
+        k = 0
+        while k < r and g == 1:
+            ys = y
+            for _ in range(min(m, r - k)):
+                y = (y * y + c) % n
+                q = q * (x - y) % n
+            g = math.gcd(q, n)
+            k += m
+        r *= 2
+        steps += r
+        if g == 1 and (steps > iterations or (budget is not None and budget.exhausted())):
+            return None
+
+    if g == n:
+        # the batch overshot, replay it one step at a time
+        while True:
+            ys = (ys * ys + c) % n
+            g = math.gcd(x - ys, n)
+            if g > 1:
+                break
+    return g if g < n else None
+
+
+def _ecm_multiplier(bound: int) -> int:
+    """
+    product of the maximal prime powers below bound (ECM stage 1 scalar)
+
+    Args:
+        bound (int): B1
+
+    Returns:
+        int: lcm(1..B1)
+    """
+    k = 1
+    for p in _primes(bound + 1):
+        q = p
+        while q * p <= bound:
+            q *= p
+        k *= q
+    return k
+
+
+def _xdbl(X: int, Z: int, a24: int, n: int) -> tuple[int, int]:
+    """
+    x-only doubling of (X:Z) on the Montgomery curve, a24 = (A+2)/4
+    """
+    s = (X + Z) * (X + Z) % n
+    d = (X - Z) * (X - Z) % n
+    t = s - d
+    return (s * d % n, t * (d + a24 * t) % n)
+
+
+def _xadd(XP: int, ZP: int, XQ: int, ZQ: int, Xd: int, Zd: int, n: int) -> tuple[int, int]:
+    """
+    x-only differential addition P+Q given P-Q = (Xd:Zd)
+    """
+    u = (XP - ZP) * (XQ + ZQ)
+    v = (XP + ZP) * (XQ - ZQ)
+    return (Zd * (u + v) * (u + v) % n, Xd * (u - v) * (u - v) % n)
+
+
+def _ladder(k: int, X: int, Z: int, a24: int, n: int) -> tuple[int, int]:
+    """
+    x-only Montgomery ladder k * (X:Z)
+    """
+    X0, Z0 = X, Z
+    X1, Z1 = _xdbl(X, Z, a24, n)
+    for bit in bin(k)[3:]:
+        if bit == "1":
+            X0, Z0 = _xadd(X1, Z1, X0, Z0, X, Z, n)
+            X1, Z1 = _xdbl(X1, Z1, a24, n)
+        else:
+            X1, Z1 = _xadd(X0, Z0, X1, Z1, X, Z, n)
+            X0, Z0 = _xdbl(X0, Z0, a24, n)
+    return (X0, Z0)
+
+
+def ecm_curve(n: int, bound: int, multiplier: int = None):
+    """
+    one Lenstra ECM curve: Montgomery curve with Suyama parametrization,
+    stage 1 up to bound and the standard stage 2 continuation up to 100 * bound
+
+    Args:
+        n (int): odd composite without small factors
+        bound (int): B1
+        multiplier (int, optional): precomputed _ecm_multiplier(bound). Defaults to None.
+
+    Returns:
+        int | None: a non-trivial factor of n
+    """
+    sigma = random.randrange(6, n - 1)
+    u = (sigma * sigma - 5) % n
+    v = 4 * sigma % n
+    X, Z = pow(u, 3, n), pow(v, 3, n)
+    denominator = 16 * X * v % n
+    g = math.gcd(denominator, n)
+    if g > 1:
+        return g if g < n else None
+    a24 = pow(v - u, 3, n) * (3 * u + v) * pow(denominator, -1, n) % n
+
+    # stage 1
+    X, Z = _ladder(multiplier or _ecm_multiplier(bound), X, Z, a24, n)
+    g = math.gcd(Z, n)
+    if g > 1:
+        return g if g < n else None
+
+    # stage 2: S[d] = 2d Q, walk R = r Q by steps of 2D Q
+    D = _ECM_STAGE2_D
+    S = [None, _xdbl(X, Z, a24, n)]
+    S.append(_xdbl(*S[1], a24, n))
+    for d in range(3, D + 1):
+        S.append(_xadd(*S[d - 1], *S[1], *S[d - 2], n))
+    beta = [None] + [Sx * Sz % n for Sx, Sz in S[1:]]
+
+    start = bound - 1 if bound % 2 == 0 else bound
+    R = _ladder(start, X, Z, a24, n)
+    T = _ladder(start - 2 * D, X, Z, a24, n)
+    primes = get_sieve()
+    primes.covers(100 * bound)
+    g = 1
+    for r in range(start, 100 * bound, 2 * D):
+        alpha = R[0] * R[1] % n
+        for q in range(r + 2, r + 2 * D + 1, 2):
+            if primes.is_prime(q):
+                delta = (q - r) // 2
+                g = g * ((R[0] - S[delta][0]) * (R[1] + S[delta][1]) - alpha + beta[delta]) % n
+        R, T = _xadd(*R, *S[D], *T, n), R
+    g = math.gcd(g, n)
+    return g if 1 < g < n else None
+
+
+def ecm(n: int, budget: _Budget = None):
+    """
+    run ECM curves with growing bounds until a factor appears
+
+    Args:
+        n (int): odd composite without small factors
+        budget (_Budget, optional): deadline. Defaults to None.
+
+    Returns:
+        int | None: a non-trivial factor of n
+    """
+    for bound, curves in ECM_LEVELS:
+        multiplier = _ecm_multiplier(bound)
+        for _ in range(curves):
+            factor = ecm_curve(n, bound, multiplier)
+            if factor:
+                return factor
+            if budget is not None and budget.exhausted():
+                return None
+    return None
+
+
+def find_factor(n: int, budget: _Budget = None):
+    """
+    one non-trivial factor of a composite, trying the cheapest method first
+
+    Args:
+        n (int): odd composite without small factors
+        budget (_Budget, optional): deadline. Defaults to None.
+
+    Returns:
+        int | None: a non-trivial factor, None if the budget ran out
+    """
+    power = perfect_power(n)
+    if power:
+        return power[0]
+    for method in (pollard_pm1, brent_rho, ecm):
+        factor = method(n, budget=budget)
+        if factor:
+            return factor
+        if budget is not None and budget.exhausted():
+            return None
+    while not (budget is not None and budget.exhausted()):
+        factor = ecm(n, budget=budget)
+        if factor:
+            return factor
+    return None
+
+
+def factorize(n: int, timeout: float = None) -> dict[int, int]:
+    """
+    complete prime factorization
+
+    Args:
+        n (int): integer > 0
+        timeout (float, optional): effort budget in seconds. Defaults to None (no limit).
+
+    Raises:
+        FactorizationTimeout: the budget ran out, the exception holds the partial result
+
+    Returns:
+        dict[int, int]: {prime: multiplicity}, sorted by prime
+    """
+    assert n > 0
+    budget = _Budget(timeout)
+    factors = {}
+    n = trial_division(n, factors)
+
+    stack = [n] if n > 1 else []
+    remaining = []
+    while stack:
+        m = stack.pop()
+        if is_probable_prime(m):
+            factors[m] = factors.get(m, 0) + 1
+            continue
+        factor = find_factor(m, budget)
+        if factor is None:
+            remaining.append(m)
+            continue
+        stack.extend((factor, m // factor))
+
+    factors = dict(sorted(factors.items()))
+    if remaining:
+        raise FactorizationTimeout(factors, remaining)
+    return factors
+
+
+def factorize_many(
+    numbers, timeout: float = None, processes: int = 1, chunksize: int = 4
+) -> list[dict[int, int]]:
+    """
+    factorize a batch of integers
+
+    Args:
+        numbers (iterable): integers > 0
+        timeout (float, optional): effort budget in seconds for each number. Defaults to None.
+        processes (int, optional): worker processes, 1 runs in this process, None uses every core. Defaults to 1.
+        chunksize (int, optional): numbers sent to a worker at once. Defaults to 4.
+
+    Raises:
+        FactorizationTimeout: one of the numbers could not be factored within its budget
+
+    Returns:
+        list[dict[int, int]]: one factorization per number, in order
+    """
+    if processes == 1:
+        return [factorize(n, timeout) for n in numbers]
+    numbers = list(numbers)
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(
+            executor.map(factorize, numbers, [timeout] * len(numbers), chunksize=chunksize)
+        )
@@ -5,8 +5,6 @@ Able to encryt a binary message with tools like Sboxes, Substition layers and Tr
 
 __author__ = "Simon Paquette"  # 300044038
 
-import numpy as np
-
 
 def _bin(dec_val: int, length: int) -> str:
     """
@@ -80,6 +78,8 @@ class SubLayer:
         Returns:
             str: output
         """
+        import numpy as np
+
         sections = np.array_split(list(bit_val), 4)
         new_bits = []
         for index, section in enumerate(sections):
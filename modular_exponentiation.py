@@ -0,0 +1,200 @@
+"""
+Modular exponentiation helpers for the public-key algorithms of the toolbox
+"""
+
+from functools import lru_cache
+
+# fixed-base tables kept by get_fixed_base_exponentiation
+FIXED_BASE_TABLES_CACHED = 8
+
+
+class FixedBaseExponentiation:
+    """
+    Fixed-base exponentiation g^k mod p with a precomputed window table:
+    table[i][d] = g^(d * 2^(w*i)), so that g^k is one product of a table entry per w-bit digit of k.
+    A larger window trades memory (about bits/w * 2^w residues) for fewer multiplications (bits/w).
+    """
+
+    def __init__(self, base: int, modulus: int, exponent_bits: int, window: int = 6):
+        """
+        precompute the window table of (base, modulus)
+
+        Args:
+            base (int): fixed base g
+            modulus (int): modulus p
+            exponent_bits (int): largest exponent size served by the table (larger ones use pow)
+            window (int, optional): bits per digit. Defaults to 6.
+        """
+        assert window > 0
+        self.base = base % modulus
+        self.modulus = modulus
+        self.exponent_bits = exponent_bits
+        self.window = window
+        self.mask = (1 << window) - 1
+
+        table = []
+        row_base = self.base
+        for _ in range(-(-exponent_bits // window)):
+            row = [1, row_base]
+            for _ in range(2, 1 << window):
+                row.append(row[-1] * row_base % modulus)
+            table.append(row)
+            # next row starts at g^(2^(w*(i+1)))
+            row_base = row[-1] * row_base % modulus
+        self.table = table
+
+    def __repr__(self) -> str:
+        """
+        printable representation of the table
+
+        Returns:
+            str: table parameters
+        """
+        return (
+            f"FixedBaseExponentiation(base={self.base}, modulus={self.modulus}, "
+            f"exponent_bits={self.exponent_bits}, window={self.window})"
+        )
+
+    def exp(self, exponent: int) -> int:
+        """
+        base^exponent mod modulus
+
+        Args:
+            exponent (int): k
+
+        Returns:
+            int: g^k mod p
+        """
+        if exponent < 0 or exponent.bit_length() > self.exponent_bits:
+            return pow(self.base, exponent, self.modulus)
+
+        modulus, mask, window = self.modulus, self.mask, self.window
+        result = 1
+        for row in self.table:
+            if not exponent:
+                break
+            digit = exponent & mask
+            if digit:
+                result = result * row[digit] % modulus
+            exponent >>= window
+        return result % modulus
+
+    def exp_many(self, exponents) -> list[int]:
+        """
+        base^k mod modulus for many exponents
+
+        Args:
+            exponents (iterable): exponents k
+
+        Returns:
+            list[int]: g^k mod p, in order
+        """
+        return [self.exp(exponent) for exponent in exponents]
+
+
+@lru_cache(maxsize=FIXED_BASE_TABLES_CACHED)
+def get_fixed_base_exponentiation(
+    base: int, modulus: int, exponent_bits: int, window: int = 6
+) -> FixedBaseExponentiation:
+    """
+    window table of (base, modulus), built once and shared by every user of the group:
+    the FIXED_BASE_TABLES_CACHED tables used last are kept, the older ones are released
+
+    Args:
+        base (int): fixed base g
+        modulus (int): modulus p
+        exponent_bits (int): largest exponent size served by the table
+        window (int, optional): bits per digit. Defaults to 6.
+
+    Returns:
+        FixedBaseExponentiation: the cached table
+    """
+    return FixedBaseExponentiation(base, modulus, exponent_bits, window)
+
+
+def sliding_window_digits(exponent: int, window: int) -> list[tuple[int, int]]:
+    """
+    sliding-window recoding of an exponent: k = sum(d * 2^j) with odd digits d < 2^w
+
+    Args:
+        exponent (int): k >= 0
+        window (int): maximal digit size in bits
+
+    Returns:
+        list[tuple[int, int]]: (position j, odd digit d), from the most significant digit
+    """
+    digits = []
+    i = exponent.bit_length() - 1
+    while i >= 0:
+        if not (exponent >> i) & 1:
+            i -= 1
+            continue
+        # widest window ending at bit i whose lowest bit is set
+        low = max(i - window + 1, 0)
+        while not (exponent >> low) & 1:
+            low += 1
+        digits.append((low, (exponent >> low) & ((1 << (i - low + 1)) - 1)))
+        i = low - 1
+    return digits
+
+
+def default_window(bits: int) -> int:
+    """
+    window size minimizing the multiplications of a sliding-window exponentiation
+
+    Args:
+        bits (int): exponent size
+
+    Returns:
+        int: window size in bits
+    """
+    for window, bound in ((1, 8), (3, 64), (4, 256), (5, 1024)):
+        if bits <= bound:
+            return window
+    return 6
+
+
+def multi_exp(bases, exponents, modulus: int, window: int = None) -> int:
+    """
+    prod(b_i^k_i) mod p in one interleaved square-and-multiply pass (Straus / Shamir trick):
+    the squarings are shared by every base, each base only adds the products of its own
+    sliding-window digits, e.g. g^a * y^b costs about as much as a single exponentiation
+
+    Args:
+        bases (iterable): bases b_i
+        exponents (iterable): exponents k_i >= 0
+        modulus (int): modulus p
+        window (int, optional): bits per digit. Defaults to a size chosen from the largest exponent.
+
+    Returns:
+        int: prod(b_i^k_i) mod p
+    """
+    bases, exponents = list(bases), list(exponents)
+    assert len(bases) == len(exponents)
+    assert all(exponent >= 0 for exponent in exponents)
+    bits = max((exponent.bit_length() for exponent in exponents), default=0)
+    if window is None:
+        window = default_window(bits)
+
+    # schedule[j]: table entries to multiply in once the squarings reached bit j
+    schedule = [[] for _ in range(bits)]
+    for base, exponent in zip(bases, exponents):
+        digits = sliding_window_digits(exponent, window)
+        if not digits:
+            continue
+        # odd powers b, b^3, ..., up to the largest digit used
+        base %= modulus
+        square = base * base % modulus
+        odd_powers = [base]
+        for _ in range(max(digit for _, digit in digits) // 2):
+            odd_powers.append(odd_powers[-1] * square % modulus)
+        for position, digit in digits:
+            schedule[position].append(odd_powers[digit >> 1])
+
+    result = 1
+    for position in range(bits - 1, -1, -1):
+        if result != 1:
+            result = result * result % modulus
+        for factor in schedule[position]:
+            result = result * factor % modulus
+    return result % modulus
@@ -0,0 +1,105 @@
+"""
+OAEP padding (RFC 8017, EME-OAEP with MGF1) for the byte-oriented RSA encryption
+"""
+
+import os
+from hashlib import sha256
+
+
+def mgf1(seed: bytes, length: int, hash_fun=sha256) -> bytes:
+    """
+    mask generation function MGF1
+
+    Args:
+        seed (bytes): seed
+        length (int): mask length in bytes
+        hash_fun (callable, optional): hashlib constructor. Defaults to sha256.
+
+    Returns:
+        bytes: mask
+    """
+    mask = bytearray()
+    counter = 0
+    while len(mask) < length:
+        mask += hash_fun(seed + counter.to_bytes(4, "big")).digest()
+        counter += 1
+    return bytes(mask[:length])
+
+
+def _xor(data: bytes, mask: bytes) -> bytes:
+    return (int.from_bytes(data, "big") ^ int.from_bytes(mask, "big")).to_bytes(len(data), "big")
+
+
+def max_message_length(k: int, hash_fun=sha256) -> int:
+    """
+    largest message one OAEP block can carry
+
+    Args:
+        k (int): byte length of the RSA modulus
+        hash_fun (callable, optional): hashlib constructor. Defaults to sha256.
+
+    Returns:
+        int: k - 2 hLen - 2 bytes
+    """
+    return k - 2 * hash_fun().digest_size - 2
+
+
+def oaep_encode(message: bytes, k: int, label: bytes = b"", hash_fun=sha256) -> bytes:
+    """
+    EME-OAEP encoding: EM = 0x00 || maskedSeed || maskedDB, DB = lHash || PS || 0x01 || M
+
+    Args:
+        message (bytes): at most max_message_length(k) bytes
+        k (int): byte length of the RSA modulus
+        label (bytes, optional): label bound to the ciphertext. Defaults to b"".
+        hash_fun (callable, optional): hashlib constructor. Defaults to sha256.
+
+    Raises:
+        ValueError: the message is too long
+
+    Returns:
+        bytes: encoded message of k bytes
+    """
+    h_len = hash_fun().digest_size
+    if len(message) > k - 2 * h_len - 2:
+        raise ValueError("message too long")
+    padding = bytes(k - len(message) - 2 * h_len - 2)
+    db = hash_fun(label).digest() + padding + b"\x01" + message
+    seed = os.urandom(h_len)
+    masked_db = _xor(db, mgf1(seed, k - h_len - 1, hash_fun))
+    masked_seed = _xor(seed, mgf1(masked_db, h_len, hash_fun))
+    return b"\x00" + masked_seed + masked_db
+
+
+def oaep_decode(encoded: bytes, k: int, label: bytes = b"", hash_fun=sha256) -> bytes:
+    """
+    EME-OAEP decoding
+
+    Args:
+        encoded (bytes): encoded message of k bytes
+        k (int): byte length of the RSA modulus
+        label (bytes, optional): label bound to the ciphertext. Defaults to b"".
+        hash_fun (callable, optional): hashlib constructor. Defaults to sha256.
+
+    Raises:
+        ValueError: the block is not a valid encoding, a single error for every cause
+
+    Returns:
+        bytes: message
+    """
+    h_len = hash_fun().digest_size
+    if len(encoded) != k or k < 2 * h_len + 2:
+        raise ValueError("decryption error")
+    masked_seed, masked_db = encoded[1 : h_len + 1], encoded[h_len + 1 :]
+    seed = _xor(masked_seed, mgf1(masked_db, h_len, hash_fun))
+    db = _xor(masked_db, mgf1(seed, k - h_len - 1, hash_fun))
+    separator = db.find(b"\x01", h_len)
+    valid = (
+        encoded[0] == 0
+        and db[:h_len] == hash_fun(label).digest()
+        and separator != -1
+        and not any(db[h_len:separator])
+    )
+    if not valid:
+        raise ValueError("decryption error")
+    return db[separator + 1 :]
@@ -0,0 +1,182 @@
+"""
+DSA presignatures: the nonce k, the commitment R = g^k mod p and k^-1 mod q do not depend on
+the message, a background worker computes them ahead of time and the online signature is only
+s = (H(m) + x r) k^-1 mod q
+"""
+
+import secrets
+import threading
+from collections import deque
+
+from modular_exponentiation import get_fixed_base_exponentiation
+
+
+def presignatures(g: int, p: int, q: int, count: int, window: int = 6) -> list[tuple[int, int, int]]:
+    """
+    fresh presignatures of a DSA group
+
+    Args:
+        g (int): generator of the subgroup of order q
+        p (int): prime modulus
+        q (int): prime order of g
+        count (int): number of presignatures
+        window (int, optional): window of the fixed-base table of g. Defaults to 6.
+
+    Returns:
+        list[tuple[int, int, int]]: (k, R = g^k mod p, k^-1 mod q) tuples
+    """
+    table = get_fixed_base_exponentiation(g, p, q.bit_length(), window)
+
+    result = []
+    while len(result) < count:
+        # secrets rather than random: forked workers would share the random state, and reuse nonces
+        k = 2 + secrets.randbelow(q - 2)
+        big_r = table.exp(k)
+        if big_r % q:
+            result.append((k, big_r, pow(k, -1, q)))
+    return result
+
+
+class PresignaturePool:
+    """
+    Pool of presignatures refilled by a background thread: once the pool falls under the
+    low-water mark, the worker computes batches until it is back at the high-water mark.
+    Every presignature is removed from the pool when taken, so a nonce is never used twice.
+
+    With process=True the batches are computed in a worker process, so that the refills do
+    not hold the GIL of the signing thread.
+    """
+
+    def __init__(
+        self,
+        g: int,
+        p: int,
+        q: int,
+        high_water: int = 256,
+        low_water: int = None,
+        batch_size: int = 32,
+        process: bool = False,
+        window: int = 6,
+    ):
+        """
+        pool of a DSA group, call start() to launch the worker
+
+        Args:
+            g (int): generator of the subgroup of order q
+            p (int): prime modulus
+            q (int): prime order of g
+            high_water (int, optional): size the worker fills the pool up to. Defaults to 256.
+            low_water (int, optional): size under which the worker refills the pool. Defaults to high_water // 4.
+            batch_size (int, optional): presignatures computed per batch. Defaults to 32.
+            process (bool, optional): compute the batches in a worker process. Defaults to False.
+            window (int, optional): window of the fixed-base table of g. Defaults to 6.
+        """
+        assert high_water > 0 and batch_size > 0
+        self.group = (g, p, q)
+        self.high_water = high_water
+        self.low_water = high_water // 4 if low_water is None else low_water
+        assert 0 <= self.low_water <= high_water
+        self.batch_size = batch_size
+        self.process = process
+        self.window = window
+        # taken presignatures that had to be computed inline because the pool was empty
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._pool = deque()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self) -> int:
+        """
+        presignatures ready to be taken
+
+        Returns:
+            int: size of the pool
+        """
+        return len(self._pool)
+
+    def __enter__(self):
+        """
+        start the worker for the duration of a with block
+
+        Returns:
+            PresignaturePool: the pool
+        """
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        """
+        stop the worker at the end of the with block
+        """
+        self.close()
+
+    def start(self):
+        """
+        launch the background worker, which fills the pool up to the high-water mark
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._wake.set()
+        self._thread = threading.Thread(target=self._run, name="presigning", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """
+        stop the background worker, the presignatures left in the pool can still be taken
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def take(self) -> tuple[int, int, int]:
+        """
+        remove a presignature from the pool, computed inline when the pool is empty
+
+        Returns:
+            tuple[int, int, int]: (k, R = g^k mod p, k^-1 mod q)
+        """
+        try:
+            # deque.popleft is atomic, two signers never get the same nonce
+            presignature = self._pool.popleft()
+        except IndexError:
+            presignature = None
+        if len(self._pool) < self.low_water:
+            self._wake.set()
+        if presignature is None:
+            # signers of several threads may miss at once
+            with self._lock:
+                self.misses += 1
+            presignature = presignatures(*self.group, 1, self.window)[0]
+        return presignature
+
+    def _run(self):
+        """
+        worker loop: wait for a wake-up, then compute batches up to the high-water mark,
+        in a worker process when process=True
+        """
+        executor = None
+        if self.process:
+            from concurrent.futures import ProcessPoolExecutor
+
+            executor = ProcessPoolExecutor(max_workers=1)
+        try:
+            while not self._stop.is_set():
+                self._wake.wait()
+                self._wake.clear()
+                while len(self._pool) < self.high_water and not self._stop.is_set():
+                    count = min(self.batch_size, self.high_water - len(self._pool))
+                    args = (*self.group, count, self.window)
+                    if executor is None:
+                        batch = presignatures(*args)
+                    else:
+                        batch = executor.submit(presignatures, *args).result()
+                    self._pool.extend(batch)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
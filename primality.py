@@ -0,0 +1,204 @@
+"""
+Primality testing engine: small-prime filter, deterministic Miller-Rabin below 2^64
+and Baillie-PSW above
+"""
+
+import math
+
+from sieve import get_sieve
+
+# Miller-Rabin bases that make the test deterministic below the bound
+# (Jaeschke, Jiang & Deng): the first 12 primes are enough for n < 2^64
+DETERMINISTIC_BASES = (
+    (2047, (2,)),
+    (1373653, (2, 3)),
+    (25326001, (2, 3, 5)),
+    (3215031751, (2, 3, 5, 7)),
+    (2152302898747, (2, 3, 5, 7, 11)),
+    (3474749660383, (2, 3, 5, 7, 11, 13)),
+    (341550071728321, (2, 3, 5, 7, 11, 13, 17)),
+    (3825123056546413051, (2, 3, 5, 7, 11, 13, 17, 19, 23)),
+    (1 << 64, (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)),
+)
+
+SMALL_PRIME_BOUND = 1000
+_small_primes = None
+_small_primorial = None
+
+
+def _small_prime_filter(n: int):
+    """
+    decide primality from the primes below SMALL_PRIME_BOUND when possible
+
+    Args:
+        n (int): an integer > 1
+
+    Returns:
+        bool | None: the answer, or None when n has no small factor and needs a real test
+    """
+    global _small_primes, _small_primorial
+    if _small_primes is None:
+        _small_primes = frozenset(get_sieve().primes(SMALL_PRIME_BOUND))
+        _small_primorial = math.prod(_small_primes)
+
+    if n < SMALL_PRIME_BOUND:
+        return n in _small_primes
+    if math.gcd(n, _small_primorial) != 1:
+        return False
+    if n < SMALL_PRIME_BOUND**2:
+        return True
+    return None
+
+
+def strong_probable_prime(n: int, base: int) -> bool:
+    """
+    one round of Miller-Rabin: n is a strong probable prime to the base
+
+    Args:
+        n (int): odd integer > 3
+        base (int): witness candidate
+
+    Returns:
+        bool: False if base proves n composite
+    """
+    base %= n
+    if base in (0, 1, n - 1):
+        return True
+
+    d = n - 1
+    s = (d & -d).bit_length() - 1
+    d >>= s
+
+    x = pow(base, d, n)
+    if x == 1 or x == n - 1:
+        return True
+    for _ in range(s - 1):
+        x = x * x % n
+        if x == n - 1:
+            return True
+    return False
+
+
+def jacobi(a: int, n: int) -> int:
+    """
+    jacobi symbol (a/n)
+
+    Args:
+        a (int): an integer
+        n (int): odd positive integer
+
+    Returns:
+        int: -1, 0 or 1
+    """
+    assert n > 0 and n % 2 == 1
+    a %= n
+    result = 1
+    while a:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+def strong_lucas_probable_prime(n: int) -> bool:
+    """
+    strong Lucas probable prime test with Selfridge parameters (P=1, Q=(1-D)/4)
+
+    Args:
+        n (int): odd integer, not a perfect square, without small factors
+
+    Returns:
+        bool: False if n is proven composite
+    """
+    if math.isqrt(n) ** 2 == n:
+        return False
+
+    # first D in 5, -7, 9, -11, ... with (D/n) = -1
+    D = 5
+    while True:
+        symbol = jacobi(D, n)
+        if symbol == -1:
+            break
+        if symbol == 0 and abs(D) != n:
+            return False
+        D = -D - 2 if D > 0 else -D + 2
+    P, Q = 1, (1 - D) // 4
+
+    # n + 1 = d * 2^s with d odd
+    d = n + 1
+    s = (d & -d).bit_length() - 1
+    d >>= s
+
+    def half(value: int) -> int:
+        value %= n
+        return (value + n) // 2 if value % 2 else value // 2
+
+    # binary ladder on the bits of d, from (U_1, V_1)
+    U, V, Qk = 1, P, Q % n
+    for bit in bin(d)[3:]:
+        U, V = U * V % n, (V * V - 2 * Qk) % n
+        Qk = Qk * Qk % n
+        if bit == "1":
+            U, V = half(P * U + V), half(D * U + P * V)
+            Qk = Qk * Q % n
+
+    if U == 0 or V == 0:
+        return True
+    for _ in range(s - 1):
+        V = (V * V - 2 * Qk) % n
+        if V == 0:
+            return True
+        Qk = Qk * Qk % n
+    return False
+
+
+def is_probable_prime(n: int) -> bool:
+    """
+    primality test: exact for n < 2^64 (deterministic Miller-Rabin bases),
+    Baillie-PSW above (no known counterexample)
+
+    Args:
+        n (int): an integer
+
+    Returns:
+        bool: n is a (probable) prime
+    """
+    if n < 2:
+        return False
+    small = _small_prime_filter(n)
+    if small is not None:
+        return small
+
+    if n < 1 << 64:
+        for bound, bases in DETERMINISTIC_BASES:
+            if n < bound:
+                return all(strong_probable_prime(n, a) for a in bases)
+
+    return strong_probable_prime(n, 2) and strong_lucas_probable_prime(n)
+
+
+def is_probable_prime_many(
+    candidates, processes: int = 1, chunksize: int = 64
+) -> list[bool]:
+    """
+    batch primality test
+
+    Args:
+        candidates (iterable): integers to test
+        processes (int, optional): worker processes, 1 runs in this process, None uses every core. Defaults to 1.
+        chunksize (int, optional): candidates sent to a worker at once. Defaults to 64.
+
+    Returns:
+        list[bool]: one result per candidate, in order
+    """
+    if processes == 1:
+        return [is_probable_prime(n) for n in candidates]
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(is_probable_prime, candidates, chunksize=chunksize))
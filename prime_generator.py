@@ -0,0 +1,203 @@
+"""
+Random prime generation: sieve a window of candidates after a random odd start
+against the small primes, then run the strong primality test on the survivors only.
+The starts are drawn from secrets, the primes being key material
+"""
+
+import random
+import secrets
+from itertools import compress
+
+from primality import is_probable_prime
+from sieve import get_sieve
+
+# candidates are sieved against every prime below this bound (3512 primes)
+SMALL_PRIMES_BOUND = 1 << 15
+
+_small_primes = None
+
+
+def small_primes() -> list[int]:
+    """
+    odd primes used to sieve the candidate windows
+
+    Returns:
+        list[int]: odd primes below SMALL_PRIMES_BOUND
+    """
+    global _small_primes
+    if _small_primes is None:
+        _small_primes = list(get_sieve().primes(SMALL_PRIMES_BOUND))[1:]
+    return _small_primes
+
+
+def sieve_window(start: int, step: int, width: int) -> list[int]:
+    """
+    positions i of the candidates start + i * step without a small prime factor,
+    crossed out with residue arithmetic: p divides start + i * step iff i = -start / step (mod p)
+
+    Args:
+        start (int): first candidate
+        step (int): distance between two candidates (even, so that candidates keep the parity of start)
+        width (int): number of candidates
+
+    Returns:
+        list[int]: positions of the surviving candidates, in increasing order
+    """
+    flags = bytearray(b"\x01") * width
+    for p in small_primes():
+        if step % p == 0:
+            if start % p == 0:
+                return []
+            continue
+        first = -start * pow(step, -1, p) % p
+        flags[first::p] = bytes(len(range(first, width, p)))
+    return list(compress(range(width), flags))
+
+
+def random_odd(bits: int, top_bits: int = 1) -> int:
+    """
+    random odd number of exactly n bits from the CSPRNG of the operating system
+
+    Args:
+        bits (int): size of the number, at least 2
+        top_bits (int, optional): leading bits set to 1. Defaults to 1.
+
+    Returns:
+        int: an odd number with 2^(bits-1) <= n < 2^bits
+    """
+    top_bits = min(top_bits, bits)
+    return secrets.randbits(bits) | (((1 << top_bits) - 1) << (bits - top_bits)) | 1
+
+
+def search_window(bits: int, width: int = None, top_bits: int = 1):
+    """
+    look for a prime in one window of candidates after a random n-bit odd number
+
+    Args:
+        bits (int): size of the prime
+        width (int, optional): number of odd candidates. Defaults to 4 * bits.
+        top_bits (int, optional): leading bits set to 1 in the start, kept by the candidates of n bits. Defaults to 1.
+
+    Returns:
+        int | None: the first prime of the window, None if the window has none
+    """
+    start = random_odd(bits, top_bits)
+    for i in sieve_window(start, 2, width or 4 * bits):
+        candidate = start + 2 * i
+        if candidate.bit_length() != bits:
+            return None
+        if is_probable_prime(candidate):
+            return candidate
+    return None
+
+
+def generate_prime(bits: int, width: int = None, top_bits: int = 1) -> int:
+    """
+    random prime of exactly n bits
+
+    Args:
+        bits (int): size of the prime, at least 2
+        width (int, optional): number of odd candidates sieved at once. Defaults to 4 * bits.
+        top_bits (int, optional): leading bits set to 1, e.g. 2 so that the product of two
+            primes of n bits has 2n bits. Tiny sizes without such a prime only keep the top bit. Defaults to 1.
+
+    Returns:
+        int: a prime p with 2^(bits-1) <= p < 2^bits
+    """
+    assert bits >= 2
+    if bits < 16:
+        # small primes would be crossed out by the sieve itself
+        primes = [p for p in get_sieve().primes(1 << bits) if p.bit_length() == bits]
+        shift = bits - min(top_bits, bits)
+        leading = [p for p in primes if (p >> shift) + 1 == 1 << (bits - shift)]
+        return secrets.choice(leading or primes)
+    while True:
+        prime = search_window(bits, width, top_bits)
+        if prime is not None:
+            return prime
+
+
+def generate_primes(
+    bits: int,
+    count: int,
+    processes: int = 1,
+    width: int = None,
+    top_bits: int = 1,
+    executor=None,
+) -> list[int]:
+    """
+    many random primes of exactly n bits
+
+    Args:
+        bits (int): size of the primes
+        count (int): number of primes
+        processes (int, optional): worker processes, 1 runs in this process, None uses every core. Defaults to 1.
+        width (int, optional): number of odd candidates sieved at once. Defaults to 4 * bits.
+        top_bits (int, optional): leading bits set to 1, see generate_prime. Defaults to 1.
+        executor (Executor, optional): pool from search_pool shared by several calls. Defaults to a pool of this call.
+
+    Returns:
+        list[int]: count primes
+    """
+    if processes == 1 or bits < 16:
+        return [generate_prime(bits, width, top_bits) for _ in range(count)]
+    return pool_search(search_window, (bits, width, top_bits), count, processes, executor)
+
+
+def search_pool(processes: int = None):
+    """
+    process pool for pool_search, to share between several searches
+
+    Args:
+        processes (int, optional): worker processes. Defaults to every core.
+
+    Returns:
+        ProcessPoolExecutor: the pool, to shut down by the caller
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    # reseed every worker, forked processes would otherwise share the random state
+    return ProcessPoolExecutor(max_workers=processes, initializer=random.seed)
+
+
+def pool_search(function, args: tuple, count: int, processes: int = None, executor=None) -> list:
+    """
+    run a randomized search on a process pool until it succeeded count times,
+    then cancel the searches still pending
+
+    Args:
+        function (callable): picklable search, returns None when it fails
+        args (tuple): arguments of every call
+        count (int): number of successful results wanted
+        processes (int, optional): worker processes. Defaults to every core.
+        executor (Executor, optional): pool from search_pool, left running. Defaults to a pool started and shut down here.
+
+    Returns:
+        list: count results, in the order they were found
+    """
+    import os
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    processes = processes or os.cpu_count()
+    results = []
+    own_executor = executor is None
+    if own_executor:
+        executor = search_pool(processes)
+    pending = set()
+    try:
+        pending = {executor.submit(function, *args) for _ in range(2 * processes)}
+        while len(results) < count:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if result is not None:
+                    results.append(result)
+                pending.add(executor.submit(function, *args))
+    finally:
+        # the searches still running are not needed anymore
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+        else:
+            for future in pending:
+                future.cancel()
+    return results[:count]
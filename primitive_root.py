@@ -0,0 +1,140 @@
+"""
+Primitive roots: g is a primitive root modulo n when g^(phi(n)/q) != 1 for every prime q dividing phi(n)
+"""
+
+import math
+
+from factorization import factorize
+
+
+def phi_factorization(modulo: int, modulo_factors: dict = None) -> tuple[int, dict[int, int]]:
+    """
+    euler totient of n and its prime factorization
+
+    Args:
+        modulo (int): n > 0
+        modulo_factors (dict, optional): factorization of n. Defaults to None (computed).
+
+    Returns:
+        tuple[int, dict[int, int]]: phi(n) and {prime: multiplicity} of phi(n)
+    """
+    if modulo_factors is None:
+        modulo_factors = factorize(modulo)
+    factors = {}
+    value = 1
+    for p, k in modulo_factors.items():
+        value *= p ** (k - 1) * (p - 1)
+        if k > 1:
+            factors[p] = factors.get(p, 0) + k - 1
+        for q, e in factorize(p - 1).items():
+            factors[q] = factors.get(q, 0) + e
+    return (value, dict(sorted(factors.items())))
+
+
+def has_primitive_root(modulo: int, modulo_factors: dict = None) -> bool:
+    """
+    (Z/nZ)* is cyclic only for n = 1, 2, 4, p^k and 2p^k with p an odd prime
+
+    Args:
+        modulo (int): n > 0
+        modulo_factors (dict, optional): factorization of n. Defaults to None (computed).
+
+    Returns:
+        bool: n has primitive roots
+    """
+    if modulo in (1, 2, 4):
+        return True
+    if modulo % 4 == 0:
+        return False
+    if modulo_factors is None:
+        modulo_factors = factorize(modulo // 2 if modulo % 2 == 0 else modulo)
+    return len([p for p in modulo_factors if p != 2]) == 1
+
+
+def is_primitive_root(
+    g: int, modulo: int, phi_value: int = None, phi_factors: dict = None
+) -> bool:
+    """
+    test g^(phi/q) != 1 mod n for every prime q dividing phi(n)
+
+    Args:
+        g (int): candidate
+        modulo (int): n
+        phi_value (int, optional): phi(n). Defaults to None (computed).
+        phi_factors (dict, optional): factorization of phi(n). Defaults to None (computed).
+
+    Returns:
+        bool: g generates (Z/nZ)*
+    """
+    if phi_value is None or phi_factors is None:
+        phi_value, phi_factors = phi_factorization(modulo)
+    if math.gcd(g, modulo) != 1:
+        return False
+    return all(pow(g, phi_value // q, modulo) != 1 for q in phi_factors)
+
+
+def iter_primitive_roots(modulo: int, phi_factors: dict = None):
+    """
+    lazily generate every primitive root modulo n, in increasing order
+
+    Args:
+        modulo (int): n
+        phi_factors (dict, optional): factorization of phi(n), n is then not factorized: when n
+            has no primitive root, no g passes the test. Defaults to None (computed).
+
+    Yields:
+        int: primitive roots
+    """
+    if modulo <= 2:
+        yield modulo - 1
+        return
+    if phi_factors is None:
+        # n is factorized once, for the cyclicity test and for phi(n)
+        modulo_factors = factorize(modulo)
+        if not has_primitive_root(modulo, modulo_factors):
+            return
+        phi_value, phi_factors = phi_factorization(modulo, modulo_factors)
+    else:
+        phi_value = math.prod(q**e for q, e in phi_factors.items())
+    for g in range(2, modulo):
+        if is_primitive_root(g, modulo, phi_value, phi_factors):
+            yield g
+
+
+def first_primitive_root(modulo: int, phi_factors: dict = None) -> int:
+    """
+    smallest primitive root modulo n
+
+    Args:
+        modulo (int): n
+        phi_factors (dict, optional): factorization of phi(n). Defaults to None (computed).
+
+    Raises:
+        ValueError: n has no primitive root
+
+    Returns:
+        int: the smallest primitive root
+    """
+    for g in iter_primitive_roots(modulo, phi_factors):
+        return g
+    raise ValueError(f"{modulo} has no primitive root")
+
+
+def first_primitive_root_many(moduli, processes: int = 1, chunksize: int = 16) -> list[int]:
+    """
+    smallest primitive root of many moduli
+
+    Args:
+        moduli (iterable): moduli that have primitive roots
+        processes (int, optional): worker processes, 1 runs in this process, None uses every core. Defaults to 1.
+        chunksize (int, optional): moduli sent to a worker at once. Defaults to 16.
+
+    Returns:
+        list[int]: one root per modulus, in order
+    """
+    if processes == 1:
+        return [first_primitive_root(modulo) for modulo in moduli]
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(first_primitive_root, moduli, chunksize=chunksize))
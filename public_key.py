@@ -3,11 +3,226 @@ Public-key cryptographic implementation
 """
 
 import math
+import sys
+from collections import Counter, OrderedDict
+from functools import partial
+from hashlib import sha256
+from itertools import islice
 
 from arithmetic import NumeralArithmetic
+from oaep import max_message_length, oaep_decode, oaep_encode
+from prime_generator import generate_primes, search_pool
 from utils import phi
 
 
+# point at infinity, the identity of the group of points: affine (x, y), Jacobian (X, Y, Z) with Z = 0
+INFINITY = (None, None)
+JACOBIAN_INFINITY = (1, 1, 0)
+
+
+def sqrt_mod(value: int, prime: int) -> int:
+    """
+    square root modulo an odd prime (Tonelli-Shanks), a single exponentiation when p = 3 mod 4
+
+    Args:
+        value (int): a
+        prime (int): prime p
+
+    Returns:
+        int | None: the smallest r with r^2 = a mod p, None when a is not a square
+    """
+    value %= prime
+    if value == 0 or prime == 2:
+        return value
+    if pow(value, (prime - 1) // 2, prime) != 1:
+        return None
+    if prime % 4 == 3:
+        root = pow(value, (prime + 1) // 4, prime)
+    else:
+        # p - 1 = q * 2^s with q odd, z a non-residue
+        q, s = prime - 1, 0
+        while q % 2 == 0:
+            q //= 2
+            s += 1
+        z = 2
+        while pow(z, (prime - 1) // 2, prime) != prime - 1:
+            z += 1
+        m, c, t, root = s, pow(z, q, prime), pow(value, q, prime), pow(value, (q + 1) // 2, prime)
+        while t != 1:
+            i, t2 = 0, t
+            while t2 != 1:
+                t2 = t2 * t2 % prime
+                i += 1
+            b = pow(c, 1 << (m - i - 1), prime)
+            m, c, t, root = i, b * b % prime, t * b * b % prime, root * b % prime
+    return min(root, prime - root)
+
+
+def wnaf(integer: int, window: int) -> list[int]:
+    """
+    width-w non-adjacent form: k = sum(d_i * 2^i) with odd digits |d_i| < 2^(w-1),
+    at most one non-zero digit in any w consecutive ones
+
+    Args:
+        integer (int): k >= 0
+        window (int): width w >= 2
+
+    Returns:
+        list[int]: digits d_i, least significant first
+    """
+    digits = []
+    modulus, half = 1 << window, 1 << (window - 1)
+    while integer:
+        digit = 0
+        if integer & 1:
+            digit = integer % modulus
+            if digit >= half:
+                digit -= modulus
+            integer -= digit
+        digits.append(digit)
+        integer >>= 1
+    return digits
+
+
+def joint_sparse_form(integer0: int, integer1: int) -> list[tuple[int, int]]:
+    """
+    joint sparse form of two scalars (Solinas): digits in {-1, 0, 1}, on average half of the
+    digit pairs are (0, 0), fewer joint additions than the two binary forms
+
+    Args:
+        integer0 (int): k0 >= 0
+        integer1 (int): k1 >= 0
+
+    Returns:
+        list[tuple[int, int]]: digit pairs (u0, u1), least significant first
+    """
+    digits = []
+    d0 = d1 = 0
+    while integer0 + d0 > 0 or integer1 + d1 > 0:
+        l0, l1 = d0 + integer0, d1 + integer1
+        u0 = u1 = 0
+        if l0 % 2:
+            u0 = 2 - l0 % 4
+            if l0 % 8 in (3, 5) and l1 % 4 == 2:
+                u0 = -u0
+        if l1 % 2:
+            u1 = 2 - l1 % 4
+            if l1 % 8 in (3, 5) and l0 % 4 == 2:
+                u1 = -u1
+        digits.append((u0, u1))
+        if 2 * d0 == 1 + u0:
+            d0 = 1 - d0
+        if 2 * d1 == 1 + u1:
+            d1 = 1 - d1
+        integer0 >>= 1
+        integer1 >>= 1
+    return digits
+
+
+def _to_list(values) -> tuple[list, tuple]:
+    """
+    flatten the input of a batch API, a NumPy array or any iterable
+
+    Args:
+        values (iterable | np.ndarray): integers
+
+    Returns:
+        tuple[list, tuple]: the values, and the shape of the array (None for other iterables)
+    """
+    # only an array if numpy is already loaded, never import it here
+    numpy = sys.modules.get("numpy")
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        return (values.ravel().tolist(), values.shape)
+    return (list(values), None)
+
+
+def _from_list(values: list, shape: tuple):
+    """
+    give the output of a batch API the form of its input
+
+    Args:
+        values (list): integers
+        shape (tuple): shape of the input array, None for other iterables
+
+    Returns:
+        list | np.ndarray: the values, an object array of that shape for an array input
+    """
+    if shape is None:
+        return values
+    import numpy as np
+
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array.reshape(shape)
+
+
+def _map_chunks(function, values, processes: int = 1, chunksize: int = 1024):
+    """
+    lazily apply a function to chunks of an iterable, on a process pool keeping
+    a bounded number of chunks in flight so that unbounded inputs stream through
+
+    Args:
+        function (callable): picklable, maps a list of values to a list of results
+        values (iterable): inputs
+        processes (int, optional): worker processes, 1 runs in this process, None uses every core. Defaults to 1.
+        chunksize (int, optional): values sent to a worker at once. Defaults to 1024.
+
+    Yields:
+        results, in input order
+    """
+    iterator = iter(values)
+    chunks = iter(lambda: list(islice(iterator, chunksize)), [])
+    if processes == 1:
+        for chunk in chunks:
+            yield from function(chunk)
+        return
+
+    import os
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+
+    in_flight = 2 * (processes or os.cpu_count())
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(function, chunk))
+            if len(pending) >= in_flight:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _read_full(file, buffer: memoryview) -> int:
+    """
+    fill a buffer from a binary file, readinto may return less than asked before the end
+
+    Args:
+        file (BinaryIO): opened binary file
+        buffer (memoryview): buffer to fill
+
+    Returns:
+        int: bytes read, less than the buffer size only at the end of the file
+    """
+    size = 0
+    while size < len(buffer):
+        read = file.readinto(buffer[size:])
+        if not read:
+            break
+        size += read
+    return size
+
+
+def _encrypt_chunk(public_key_e: int, pq: int, phi: int, messages: list[int]) -> list[int]:
+    # the checks of RSA.encrypt, once per chunk
+    assert all(isinstance(message, int) for message in messages)
+    assert 0 < min(messages) and max(messages) < phi
+    return [pow(message, public_key_e, pq) for message in messages]
+
+
+def _decrypt_chunk(rsa: "RSA", ciphertexts: list[int]) -> list[int]:
+    return [rsa.decrypt_CRT(ciphertext) for ciphertext in ciphertexts]
+
+
 class RSA:
     """
     Public-key RSA implementation
@@ -20,6 +235,7 @@ class RSA:
         prime_p: int = None,
         prime_q: int = None,
         pq: int = None,
+        primes: list[int] = None,
     ):
         """
         algo and keys initialization
@@ -30,17 +246,88 @@ class RSA:
             prime_p (int, optional): big integer prime p. Defaults to None.
             prime_q (int, optional): big integer prime q. Defaults to None.
             pq (int, optional): modulo n, product of p and q. Defaults to None.
+            primes (list[int], optional): distinct primes r1 = p, r2 = q, r3, ... of a multi-prime modulo n (RFC 8017). Defaults to None.
         """
+        if primes is not None:
+            assert len(primes) >= 2
+            assert len(set(primes)) == len(primes)
+            prime_p, prime_q = primes[0], primes[1]
+        elif (prime_p is not None) and (prime_q is not None):
+            primes = [prime_p, prime_q]
+
         self.public_key_e = public_key_e
         self.private_key_d = private_key_d
         self.prime_p = prime_p
         self.prime_q = prime_q
+        self.primes = None if primes is None else list(primes)
         self.pq = pq
 
-        if (pq is None) and (prime_p is not None) and (prime_q is not None):
-            self.pq = prime_p * prime_q
+        if (pq is None) and (primes is not None):
+            self.pq = math.prod(primes)
+
+        if primes is not None:
+            # phi(n) without factoring n
+            if prime_p == prime_q:
+                self.phi = prime_p * (prime_p - 1)
+            else:
+                self.phi = math.prod(prime - 1 for prime in primes)
+        else:
+            self.phi = phi(self.pq)
+
+        # CRT decryption exponents and coefficient (dP, dQ, qInv), and (r_i, d_i, t_i) of the
+        # primes after p and q, set with the private key
+        self.crt: tuple[int, int, int] = None
+        self.other_prime_infos: list[tuple[int, int, int]] = []
+        if private_key_d is not None:
+            self._set_crt()
+
+    @classmethod
+    def generate(
+        cls, bits: int, public_key_e: int = 65537, processes: int = 1, primes_count: int = 2
+    ) -> "RSA":
+        """
+        new RSA key with a modulus of exactly n bits
+
+        Args:
+            bits (int): size of the modulus n, at least 2 bits more than e
+            public_key_e (int, optional): public exponent. Defaults to 65537.
+            processes (int, optional): worker processes searching the primes, 1 runs in this process, None uses every core. Defaults to 1.
+            primes_count (int, optional): number of primes of n, 3 or 4 speed up the decryption of large moduli. Defaults to 2.
 
-        self.phi = phi(self.pq)
+        Returns:
+            RSA: key with e, d, the primes and n set
+        """
+        assert bits >= public_key_e.bit_length() + 2
+        assert primes_count >= 2 and bits // primes_count >= 2
+        # prime sizes adding up to the modulus size, each prime with its t top bits set is at
+        # least (1 - 2^-t) 2^size, and 2^t >= 2k gives (1 - 2^-t)^k >= 1/2 for k primes:
+        # the product always has exactly n bits
+        sizes = Counter(bits // primes_count + (i < bits % primes_count) for i in range(primes_count))
+        top_bits = (primes_count - 1).bit_length() + 1
+        # one pool for every search of the key, retries included
+        executor = search_pool(processes) if processes != 1 else None
+        try:
+            while True:
+                # one search per distinct size, the sizes differ by one bit at most
+                primes = []
+                for size, count in sizes.items():
+                    primes += generate_primes(
+                        size, count, processes, top_bits=top_bits, executor=executor
+                    )
+                phi_n = math.prod(prime - 1 for prime in primes)
+                if (
+                    len(set(primes)) == primes_count
+                    and math.prod(primes).bit_length() == bits
+                    and public_key_e < phi_n
+                    and math.gcd(public_key_e, phi_n) == 1
+                ):
+                    break
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        rsa = cls(primes=primes)
+        rsa.set_keys(public_key_e)
+        return rsa
 
     def __repr__(self) -> str:
         """
@@ -75,13 +362,42 @@ class RSA:
         """
         assert isinstance(self.pq, int)
 
-    def select_keys(self):
+    def _set_crt(self):
+        """
+        precompute dP = d mod p-1, dQ = d mod q-1 and qInv = q^-1 mod p when p and q are known,
+        and d_i = d mod r_i-1 and t_i = (r1 * ... * r_i-1)^-1 mod r_i for the other primes
         """
-        choose public and private keys if none given
+        self.crt = None
+        self.other_prime_infos = []
+        if self.primes is None or self.private_key_d is None or self.prime_p == self.prime_q:
+            return
+        self.crt = (
+            self.private_key_d % (self.prime_p - 1),
+            self.private_key_d % (self.prime_q - 1),
+            pow(self.prime_q, -1, self.prime_p),
+        )
+        product = self.prime_p * self.prime_q
+        for prime in self.primes[2:]:
+            self.other_prime_infos.append(
+                (prime, self.private_key_d % (prime - 1), pow(product, -1, prime))
+            )
+            product *= prime
+
+    def select_keys(self, public_key: int = 65537):
+        """
+        choose public and private keys if none given: the usual public key 65537,
+        or the largest valid one for moduli too small for it
+
+        Args:
+            public_key (int, optional): preferred RSA public key. Defaults to 65537.
         """
         assert self.public_key_e is None
         assert self.private_key_d is None
 
+        if public_key < self.phi and math.gcd(public_key, self.phi) == 1:
+            self.set_keys(public_key)
+            return
+
         for i in range(self.phi - 1, 1, -1):
             try:
                 self.public_key_e = i
@@ -96,6 +412,7 @@ class RSA:
                 pass
             except ZeroDivisionError:
                 pass
+        self._set_crt()
 
     def set_keys(self, public_key: int):
         """
@@ -111,6 +428,7 @@ class RSA:
         )
         self._valid_public_key_e()
         self._valid_private_key_d()
+        self._set_crt()
 
     def encrypt(self, message: int) -> int:
         """
@@ -131,12 +449,233 @@ class RSA:
         c = pow(base=message, exp=self.public_key_e, mod=self.pq)
         return c
 
-    def decrypt(self, ciphertext: int) -> int:
+    def iter_encrypt(self, messages, processes: int = 1, chunksize: int = 1024):
         """
-        RSA decryption alfo
+        lazily encrypt a stream of messages, the key being validated once
+
+        Args:
+            messages (iterable): plaintexts, possibly unbounded
+            processes (int, optional): worker processes, 1 runs in this process, None uses every core. Defaults to 1.
+            chunksize (int, optional): messages sent to a worker at once. Defaults to 1024.
+
+        Yields:
+            int: RSA ciphertexts, in order
+        """
+        self._valid_public_key_e()
+        self._valid_pq()
+        function = partial(_encrypt_chunk, self.public_key_e, self.pq, self.phi)
+        yield from _map_chunks(function, messages, processes, chunksize)
+
+    def iter_decrypt(self, ciphertexts, processes: int = 1, chunksize: int = 1024):
+        """
+        lazily decrypt a stream of ciphertexts, the key being validated once
+
+        Args:
+            ciphertexts (iterable): RSA encrypted messages, possibly unbounded
+            processes (int, optional): worker processes, 1 runs in this process, None uses every core. Defaults to 1.
+            chunksize (int, optional): ciphertexts sent to a worker at once. Defaults to 1024.
+
+        Yields:
+            int: plaintexts, in order
+        """
+        self._valid_private_key_d()
+        self._valid_pq()
+        if self.crt is None:
+            self._set_crt()
+        function = partial(_decrypt_chunk, self)
+        yield from _map_chunks(function, ciphertexts, processes, chunksize)
+
+    def encrypt_many(self, messages, processes: int = 1, chunksize: int = 1024):
+        """
+        encrypt many messages, the key being validated once
+
+        Args:
+            messages (iterable | np.ndarray): plaintexts
+            processes (int, optional): worker processes, 1 runs in this process, None uses every core. Defaults to 1.
+            chunksize (int, optional): messages sent to a worker at once. Defaults to 1024.
+
+        Returns:
+            list[int] | np.ndarray: ciphertexts, an object array of the same shape for an array input
+        """
+        messages, shape = _to_list(messages)
+        return _from_list(list(self.iter_encrypt(messages, processes, chunksize)), shape)
+
+    def decrypt_many(self, ciphertexts, processes: int = 1, chunksize: int = 1024):
+        """
+        decrypt many ciphertexts, the key being validated once
+
+        Args:
+            ciphertexts (iterable | np.ndarray): RSA encrypted messages
+            processes (int, optional): worker processes, 1 runs in this process, None uses every core. Defaults to 1.
+            chunksize (int, optional): ciphertexts sent to a worker at once. Defaults to 1024.
+
+        Returns:
+            list[int] | np.ndarray: plaintexts, an object array of the same shape for an array input
+        """
+        ciphertexts, shape = _to_list(ciphertexts)
+        return _from_list(list(self.iter_decrypt(ciphertexts, processes, chunksize)), shape)
+
+    def byte_length(self) -> int:
+        """
+        size k of the modulus in bytes, the size of every ciphertext block
+
+        Returns:
+            int: k
+        """
+        return (self.pq.bit_length() + 7) // 8
+
+    def _encrypt_blocks(self, data, output: bytearray, label: bytes, hash_fun) -> int:
+        """
+        OAEP-encrypt data block by block into a preallocated buffer
+
+        Args:
+            data (bytes-like): plaintext
+            output (bytearray): buffer of at least k bytes per block
+            label (bytes): OAEP label
+            hash_fun (callable): hashlib constructor
+
+        Returns:
+            int: bytes written to the buffer
+        """
+        k = self.byte_length()
+        block = max_message_length(k, hash_fun)
+        assert block > 0, "modulus too small for OAEP with this hash"
+        e, n = self.public_key_e, self.pq
+        offset = 0
+        for start in range(0, len(data), block):
+            encoded = oaep_encode(data[start : start + block], k, label, hash_fun)
+            output[offset : offset + k] = pow(int.from_bytes(encoded, "big"), e, n).to_bytes(k, "big")
+            offset += k
+        return offset
+
+    def _decrypt_blocks(self, data, output: bytearray, label: bytes, hash_fun) -> int:
+        """
+        decrypt k-byte blocks and remove their OAEP padding into a preallocated buffer
+
+        Args:
+            data (bytes-like): ciphertext, a whole number of k-byte blocks
+            output (bytearray): buffer of at least max_message_length(k) bytes per block
+            label (bytes): OAEP label
+            hash_fun (callable): hashlib constructor
+
+        Raises:
+            ValueError: a block is not a valid ciphertext
+
+        Returns:
+            int: bytes written to the buffer
+        """
+        k = self.byte_length()
+        if len(data) % k:
+            raise ValueError("ciphertext length is not a multiple of the modulus size")
+        offset = 0
+        for start in range(0, len(data), k):
+            ciphertext = int.from_bytes(data[start : start + k], "big")
+            if ciphertext >= self.pq:
+                raise ValueError("decryption error")
+            encoded = self.decrypt_CRT(ciphertext).to_bytes(k, "big")
+            message = oaep_decode(encoded, k, label, hash_fun)
+            output[offset : offset + len(message)] = message
+            offset += len(message)
+        return offset
+
+    def encrypt_bytes(self, data: bytes, label: bytes = b"", hash_fun=sha256) -> bytes:
+        """
+        RSA-OAEP encryption of data of any length, split in blocks of max_message_length(k) bytes
+
+        Args:
+            data (bytes): plaintext
+            label (bytes, optional): OAEP label. Defaults to b"".
+            hash_fun (callable, optional): hashlib constructor of OAEP and MGF1. Defaults to sha256.
+
+        Returns:
+            bytes: ciphertext, k bytes per block
+        """
+        self._valid_public_key_e()
+        self._valid_pq()
+        block = max_message_length(self.byte_length(), hash_fun)
+        output = bytearray(self.byte_length() * -(-len(data) // max(block, 1)))
+        self._encrypt_blocks(memoryview(data), output, label, hash_fun)
+        return bytes(output)
+
+    def decrypt_bytes(self, data: bytes, label: bytes = b"", hash_fun=sha256) -> bytes:
+        """
+        RSA-OAEP decryption of encrypt_bytes output, with the CRT when the primes are known
+
+        Args:
+            data (bytes): ciphertext
+            label (bytes, optional): OAEP label. Defaults to b"".
+            hash_fun (callable, optional): hashlib constructor of OAEP and MGF1. Defaults to sha256.
+
+        Raises:
+            ValueError: the ciphertext is invalid
+
+        Returns:
+            bytes: plaintext
+        """
+        self._valid_private_key_d()
+        self._valid_pq()
+        output = bytearray(len(data))
+        size = self._decrypt_blocks(memoryview(data), output, label, hash_fun)
+        return bytes(output[:size])
+
+    def encrypt_file(
+        self, source: str, destination: str, label: bytes = b"", hash_fun=sha256, blocks: int = 256
+    ):
+        """
+        RSA-OAEP encryption of a file, streamed blocks at a time through reused buffers
+
+        Args:
+            source (str): path of the plaintext
+            destination (str): path of the ciphertext
+            label (bytes, optional): OAEP label. Defaults to b"".
+            hash_fun (callable, optional): hashlib constructor of OAEP and MGF1. Defaults to sha256.
+            blocks (int, optional): blocks read at once, the memory used is about blocks * 2k bytes. Defaults to 256.
+        """
+        self._valid_public_key_e()
+        self._valid_pq()
+        k = self.byte_length()
+        block = max_message_length(k, hash_fun)
+        assert block > 0, "modulus too small for OAEP with this hash"
+        buffer = memoryview(bytearray(block * blocks))
+        output = bytearray(k * blocks)
+        with open(source, "rb") as plaintext, open(destination, "wb") as ciphertext:
+            while size := _read_full(plaintext, buffer):
+                written = self._encrypt_blocks(buffer[:size], output, label, hash_fun)
+                ciphertext.write(memoryview(output)[:written])
+
+    def decrypt_file(
+        self, source: str, destination: str, label: bytes = b"", hash_fun=sha256, blocks: int = 256
+    ):
+        """
+        RSA-OAEP decryption of a file, streamed blocks at a time through reused buffers
+
+        Args:
+            source (str): path of the ciphertext
+            destination (str): path of the plaintext
+            label (bytes, optional): OAEP label. Defaults to b"".
+            hash_fun (callable, optional): hashlib constructor of OAEP and MGF1. Defaults to sha256.
+            blocks (int, optional): blocks read at once, the memory used is about blocks * 2k bytes. Defaults to 256.
+
+        Raises:
+            ValueError: the ciphertext is invalid
+        """
+        self._valid_private_key_d()
+        self._valid_pq()
+        k = self.byte_length()
+        buffer = memoryview(bytearray(k * blocks))
+        output = bytearray(k * blocks)
+        with open(source, "rb") as ciphertext, open(destination, "wb") as plaintext:
+            while size := _read_full(ciphertext, buffer):
+                written = self._decrypt_blocks(buffer[:size], output, label, hash_fun)
+                plaintext.write(memoryview(output)[:written])
+
+    def decrypt(self, ciphertext: int, executor=None) -> int:
+        """
+        RSA decryption algo, with the CRT when the primes are known
 
         Args:
             ciphertext (int): RSA encrypted message
+            executor (Executor, optional): pool computing the per-prime exponentiations, see decrypt_CRT. Defaults to None.
 
         Returns:
             int: plaintext
@@ -145,33 +684,63 @@ class RSA:
         self._valid_private_key_d()
         self._valid_pq()
 
+        if self.crt is not None:
+            return self.decrypt_CRT(ciphertext, executor=executor)
         m = pow(base=ciphertext, exp=self.private_key_d, mod=self.pq)
         return m
 
-    def decrypt_CRT(self, ciphertext: int) -> None:
+    def decrypt_CRT(self, ciphertext: int, pprint: bool = False, executor=None) -> int:
         """
-        printable steps of chinese remainder theorem
+        RSA decryption with the chinese remainder theorem and Garner recombination (RFC 8017):
+        one exponentiation per prime instead of one mod n, the cost of an exponentiation
+        growing about with the cube of the modulus size
 
         Args:
             ciphertext (int): RSA encrypted message
-        """
-        vp = pow(ciphertext, self.private_key_d % (self.prime_p - 1), self.prime_p)
-        vq = pow(ciphertext, self.private_key_d % (self.prime_q - 1), self.prime_q)
-        xp = self.prime_q * pow(self.prime_q, -1, self.prime_p)
-        xq = self.prime_p * pow(self.prime_p, -1, self.prime_q)
-        plaintext = (vp * xp + vq * xq) % self.pq
+            pprint (bool, optional): print the steps. Defaults to False.
+            executor (Executor, optional): pool computing the per-prime exponentiations concurrently,
+                a ProcessPoolExecutor for very large keys (pow holds the GIL). Defaults to None.
 
-        print(
-            f"vp = c^(d mod p-1) mod p = {ciphertext}^({self.private_key_d} mod {self.prime_p-1}) mod {self.prime_p} = {vp}"
-        )
-        print(
-            f"vq = c^(d mod q-1) mod q = {ciphertext}^({self.private_key_d} mod {self.prime_q-1}) mod {self.prime_q} = {vq}"
-        )
-        print(f"xp = q * q^-1 mod p = {xp}")
-        print(f"xq = p * p^-1 mod q = {xq}")
-        print(
-            f"Plaintext = (vp*xp + vq*xq) mod n = ({vp}*{xp} + {vq}*{xq}) mod {self.pq} = {plaintext}"
-        )
+        Returns:
+            int: plaintext
+        """
+        if self.crt is None:
+            self._set_crt()
+        if self.crt is None:
+            # primes unknown
+            return pow(base=ciphertext, exp=self.private_key_d, mod=self.pq)
+        dp, dq, q_inv = self.crt
+        p, q = self.prime_p, self.prime_q
+        exponents = [dp, dq] + [d_i for _, d_i, _ in self.other_prime_infos]
+
+        if executor is None:
+            values = [pow(ciphertext, exponent, prime) for exponent, prime in zip(exponents, self.primes)]
+        else:
+            values = list(executor.map(pow, [ciphertext] * len(self.primes), exponents, self.primes))
+        vp, vq = values[:2]
+        h = q_inv * (vp - vq) % p
+        plaintext = vq + h * q
+
+        if pprint:
+            print(f"vp = c^(d mod p-1) mod p = {ciphertext}^{dp} mod {p} = {vp}")
+            print(f"vq = c^(d mod q-1) mod q = {ciphertext}^{dq} mod {q} = {vq}")
+            print(f"qInv = q^-1 mod p = {q_inv}")
+            print(f"h = qInv * (vp - vq) mod p = {q_inv} * ({vp} - {vq}) mod {p} = {h}")
+            print(f"m = vq + h*q = {vq} + {h}*{q} = {plaintext}")
+
+        product = p * q
+        for i, ((prime, d_i, t_i), v_i) in enumerate(zip(self.other_prime_infos, values[2:]), 3):
+            h = t_i * (v_i - plaintext) % prime
+            if pprint:
+                print(f"v{i} = c^(d mod r{i}-1) mod r{i} = {ciphertext}^{d_i} mod {prime} = {v_i}")
+                print(f"h = t{i} * (v{i} - m) mod r{i} = {t_i} * ({v_i} - {plaintext}) mod {prime} = {h}")
+                print(f"m = m + h*(r1*...*r{i-1}) = {plaintext} + {h}*{product} = {plaintext + h * product}")
+            plaintext += h * product
+            product *= prime
+
+        if pprint:
+            print(f"Plaintext = {plaintext}")
+        return plaintext
 
 
 class ECurve:
@@ -231,6 +800,19 @@ class ECurve_GFP(ECurve):
         ECurve (_type_): EC
     """
 
+    def __init__(self, prime: int, a: int, b: int):
+        """
+        basic representation of EC
+
+        Args:
+            prime (int): field of the prime (mod)
+            a (int): value a in the EC formula
+            b (int): value b in the EC formula
+        """
+        super().__init__(prime, a, b)
+        # a = -3 (NIST curves) saves two multiplications per doubling
+        self.a_is_minus_3 = (a + 3) % prime == 0
+
     def get_equation(self) -> str:
         """
         get equation representing the EC
@@ -251,10 +833,70 @@ class ECurve_GFP(ECurve):
         Returns:
             bool: this point exists
         """
+        if (x, y) == INFINITY:
+            return True
         left = pow(y, 2, self.prime)
-        right = (x**3 + self.a * x + self.b) % self.prime
+        right = (pow(x, 3, self.prime) + self.a * x + self.b) % self.prime
         return left == right
 
+    def iter_points(self):
+        """
+        lazily generate the points of this EC one x at a time: the y are the square roots
+        of x^3 + ax + b, O(p) square roots instead of O(p^2) is_point calls
+
+        Yields:
+            tuple[int, int]: points (x, y), ordered by x then y, without INFINITY
+        """
+        p = self.prime
+        for x in range(p):
+            y = sqrt_mod(pow(x, 3, p) + self.a * x + self.b, p)
+            if y is None:
+                continue
+            yield (x, y)
+            if y != p - y and y:
+                yield (x, p - y)
+
+    def list_point(self) -> list[tuple[int, int]]:
+        """
+        List all points that exists in this EC
+
+        Returns:
+            list[tuple[int, int]]: a list of points (x,y), ordered by x then y
+        """
+        return list(self.iter_points())
+
+    def points_array(self) -> "np.ndarray":
+        """
+        every point of this EC with NumPy: a table of the square roots of every residue,
+        looked up at x^3 + ax + b for every x at once
+
+        Raises:
+            ValueError: p too large for int64 products (p >= 2^31) or for a table of p entries
+
+        Returns:
+            np.ndarray: int64 array of shape (n, 2), points (x, y) ordered by x then y, without INFINITY
+        """
+        import numpy as np
+
+        p = self.prime
+        if p >= 1 << 31:
+            raise ValueError(f"{p} is too large for a square-root table, use iter_points")
+        values = np.arange(p, dtype=np.int64)
+        # every non-zero square has one root in [1, p // 2]
+        half = values[: p // 2 + 1]
+        roots = np.full(p, -1, dtype=np.int64)
+        roots[half * half % p] = half
+
+        right = (values * values % p * values + (self.a % p) * values + self.b % p) % p
+        ys = roots[right]
+        found = ys >= 0
+        xs, ys = values[found], ys[found]
+        opposite = (ys != 0) & (ys != p - ys)
+        xs = np.concatenate([xs, xs[opposite]])
+        ys = np.concatenate([ys, p - ys[opposite]])
+        order = np.lexsort((ys, xs))
+        return np.stack([xs[order], ys[order]], axis=1)
+
     def negative_point(self, x: int, y: int) -> tuple[int, int]:
         """
         get the inverse of a point
@@ -266,6 +908,8 @@ class ECurve_GFP(ECurve):
         Returns:
             tuple[int, int]: inverse (negative) of a point
         """
+        if (x, y) == INFINITY:
+            return INFINITY
         return (x, (-y) % self.prime)
 
     def double_point(self, x: int, y: int) -> tuple[int, int]:
@@ -277,8 +921,10 @@ class ECurve_GFP(ECurve):
             y (int): coord y
 
         Returns:
-            tuple[int, int]: 2P
+            tuple[int, int]: 2P, INFINITY for the identity and the points of order 2 (y = 0)
         """
+        if (x, y) == INFINITY or y % self.prime == 0:
+            return INFINITY
         slope = ((3 * x**2 + self.a) * (pow(2 * y, -1, self.prime))) % self.prime
         xr = (slope**2 - 2 * x) % self.prime
         yr = (slope * (x - xr) - y) % self.prime
@@ -295,33 +941,457 @@ class ECurve_GFP(ECurve):
             yq (int): coord y of point 2
 
         Returns:
-            tuple[int, int]: sum of two points
+            tuple[int, int]: sum of two points, INFINITY for P + (-P)
         """
+        if (xp, yp) == INFINITY:
+            return (xq, yq)
+        if (xq, yq) == INFINITY:
+            return (xp, yp)
+        if (xp - xq) % self.prime == 0:
+            if (yp - yq) % self.prime == 0:
+                return self.double_point(xp, yp)
+            return INFINITY
         slope = (((yq - yp) % self.prime) * (pow(xq - xp, -1, self.prime))) % self.prime
         xr = (slope**2 - xp - xq) % self.prime
         yr = (-yp + slope * (xp - xr)) % self.prime
         return (xr, yr)
 
-    def multiplication(self, integer: int, x: int, y: int) -> tuple[int, int]:
+    def to_jacobian(self, x: int, y: int) -> tuple[int, int, int]:
         """
-        multiply a point by itself n times
+        Jacobian coordinates (X, Y, Z) of an affine point, x = X/Z^2 and y = Y/Z^3:
+        the group law needs no inversion in these coordinates
 
         Args:
-            integer (int): n times
             x (int): coord x
             y (int): coord y
 
         Returns:
-            tuple[int, int]: a new point
+            tuple[int, int, int]: (x, y, 1), JACOBIAN_INFINITY for INFINITY
         """
-        assert integer > 1
-        temp_x, temp_y = self.double_point(x, y)
-        for _ in range(integer - 2):
-            temp_x, temp_y = self.addition(temp_x, temp_y, x, y)
-        return (temp_x, temp_y)
+        if (x, y) == INFINITY:
+            return JACOBIAN_INFINITY
+        return (x % self.prime, y % self.prime, 1)
 
-    def substraction(self):
-        raise NotImplementedError
+    def to_affine(self, X: int, Y: int, Z: int) -> tuple[int, int]:
+        """
+        affine coordinates of a Jacobian point, the single inversion of a computation
+
+        Args:
+            X (int): Jacobian coord X
+            Y (int): Jacobian coord Y
+            Z (int): Jacobian coord Z
+
+        Returns:
+            tuple[int, int]: (X/Z^2, Y/Z^3), INFINITY when Z = 0
+        """
+        if Z % self.prime == 0:
+            return INFINITY
+        z_inv = pow(Z, -1, self.prime)
+        z_inv2 = z_inv * z_inv % self.prime
+        return (X * z_inv2 % self.prime, Y * z_inv2 * z_inv % self.prime)
+
+    def jacobian_double(self, X: int, Y: int, Z: int) -> tuple[int, int, int]:
+        """
+        2P in Jacobian coordinates (dbl-1998-cmo-2, M = 3(X - Z^2)(X + Z^2) when a = -3 as in dbl-2001-b)
+
+        Args:
+            X (int): Jacobian coord X
+            Y (int): Jacobian coord Y
+            Z (int): Jacobian coord Z
+
+        Returns:
+            tuple[int, int, int]: 2P
+        """
+        p = self.prime
+        if Z == 0 or Y == 0:
+            return JACOBIAN_INFINITY
+        YY = Y * Y % p
+        ZZ = Z * Z % p
+        S = 4 * X * YY % p
+        if self.a_is_minus_3:
+            M = 3 * (X - ZZ) * (X + ZZ) % p
+        else:
+            M = (3 * X * X + self.a * ZZ * ZZ) % p
+        X3 = (M * M - 2 * S) % p
+        Y3 = (M * (S - X3) - 8 * YY * YY) % p
+        Z3 = 2 * Y * Z % p
+        return (X3, Y3, Z3)
+
+    def jacobian_addition(
+        self, X1: int, Y1: int, Z1: int, X2: int, Y2: int, Z2: int
+    ) -> tuple[int, int, int]:
+        """
+        P + Q in Jacobian coordinates (add-1998-cmo-2), its mixed form when Q is affine (Z2 = 1)
+        saves 4 multiplications
+
+        Args:
+            X1 (int): Jacobian coord X of point 1
+            Y1 (int): Jacobian coord Y of point 1
+            Z1 (int): Jacobian coord Z of point 1
+            X2 (int): Jacobian coord X of point 2
+            Y2 (int): Jacobian coord Y of point 2
+            Z2 (int): Jacobian coord Z of point 2
+
+        Returns:
+            tuple[int, int, int]: P + Q
+        """
+        p = self.prime
+        if Z1 == 0:
+            return (X2, Y2, Z2)
+        if Z2 == 0:
+            return (X1, Y1, Z1)
+        Z1Z1 = Z1 * Z1 % p
+        U2 = X2 * Z1Z1 % p
+        S2 = Y2 * Z1 * Z1Z1 % p
+        if Z2 == 1:
+            U1, S1 = X1, Y1
+        else:
+            Z2Z2 = Z2 * Z2 % p
+            U1 = X1 * Z2Z2 % p
+            S1 = Y1 * Z2 * Z2Z2 % p
+        H = (U2 - U1) % p
+        R = (S2 - S1) % p
+        if H == 0:
+            if R == 0:
+                return self.jacobian_double(X1, Y1, Z1)
+            return JACOBIAN_INFINITY
+        HH = H * H % p
+        HHH = H * HH % p
+        V = U1 * HH % p
+        X3 = (R * R - HHH - 2 * V) % p
+        Y3 = (R * (V - X3) - S1 * HHH) % p
+        Z3 = Z1 * H % p if Z2 == 1 else Z1 * Z2 * H % p
+        return (X3, Y3, Z3)
+
+    def batch_to_affine(self, points: list[tuple[int, int, int]]) -> list[tuple[int, int]]:
+        """
+        affine coordinates of many Jacobian points with a single inversion (Montgomery's trick:
+        invert the product of the Z, then peel off each 1/Z with two multiplications)
+
+        Args:
+            points (list[tuple[int, int, int]]): Jacobian points
+
+        Returns:
+            list[tuple[int, int]]: affine points, INFINITY for the points at infinity
+        """
+        p = self.prime
+        prefix = [1]
+        for _, _, Z in points:
+            prefix.append(prefix[-1] * Z % p if Z % p else prefix[-1])
+        inverse = pow(prefix[-1], -1, p)
+        affine = [INFINITY] * len(points)
+        for i in range(len(points) - 1, -1, -1):
+            X, Y, Z = points[i]
+            if Z % p == 0:
+                continue
+            z_inv = inverse * prefix[i] % p
+            inverse = inverse * Z % p
+            z_inv2 = z_inv * z_inv % p
+            affine[i] = (X * z_inv2 % p, Y * z_inv2 * z_inv % p)
+        return affine
+
+    def odd_multiples(self, x: int, y: int, count: int) -> list[tuple[int, int]]:
+        """
+        P, 3P, 5P, ..., (2 count - 1)P in affine coordinates, for mixed additions
+
+        Args:
+            x (int): coord x
+            y (int): coord y
+            count (int): number of multiples
+
+        Returns:
+            list[tuple[int, int]]: odd multiples of P
+        """
+        point = self.to_jacobian(x, y)
+        twice = self.jacobian_double(*point)
+        multiples = [point]
+        for _ in range(count - 1):
+            multiples.append(self.jacobian_addition(*multiples[-1], *twice))
+        return self.batch_to_affine(multiples)
+
+    def multiplication(
+        self, integer: int, x: int, y: int, method: str = "wnaf", window: int = 4
+    ) -> tuple[int, int]:
+        """
+        multiply a point by itself n times in O(log n) Jacobian group operations
+
+        methods:
+            "wnaf": width-w NAF, a doubling per bit and an addition per w+1 bits, the default
+            "ladder": Montgomery ladder, one addition and one doubling per bit whatever the bit
+            "double_and_add": a doubling per bit and an addition per set bit
+
+        Args:
+            integer (int): n times, negative for -P
+            x (int): coord x
+            y (int): coord y
+            method (str, optional): "wnaf", "ladder" or "double_and_add". Defaults to "wnaf".
+            window (int, optional): width of the NAF, 2^(w-2) precomputed points. Defaults to 4.
+
+        Raises:
+            ValueError: unknown method
+
+        Returns:
+            tuple[int, int]: a new point, INFINITY for n = 0
+        """
+        if integer < 0:
+            integer, (x, y) = -integer, self.negative_point(x, y)
+        if integer == 0 or (x, y) == INFINITY:
+            return INFINITY
+
+        if method == "wnaf":
+            multiples = self.odd_multiples(x, y, 1 << (window - 2))
+            result = JACOBIAN_INFINITY
+            for digit in reversed(wnaf(integer, window)):
+                result = self.jacobian_double(*result)
+                if digit:
+                    mx, my = multiples[abs(digit) >> 1]
+                    if mx is not None:
+                        result = self.jacobian_addition(*result, mx, my if digit > 0 else -my, 1)
+            return self.to_affine(*result)
+
+        point = self.to_jacobian(x, y)
+        if method == "ladder":
+            # invariant R1 - R0 = P, the same operations for a 0 bit as for a 1 bit
+            r0, r1 = JACOBIAN_INFINITY, point
+            for bit in bin(integer)[2:]:
+                if bit == "1":
+                    r0, r1 = self.jacobian_addition(*r0, *r1), self.jacobian_double(*r1)
+                else:
+                    r0, r1 = self.jacobian_double(*r0), self.jacobian_addition(*r0, *r1)
+            return self.to_affine(*r0)
+
+        if method == "double_and_add":
+            result = JACOBIAN_INFINITY
+            for bit in bin(integer)[2:]:
+                result = self.jacobian_double(*result)
+                if bit == "1":
+                    result = self.jacobian_addition(*result, *point)
+            return self.to_affine(*result)
+
+        raise ValueError(f"unknown scalar multiplication method {method}")
+
+    def multi_multiplication(
+        self, integer0: int, x0: int, y0: int, integer1: int, x1: int, y1: int
+    ) -> tuple[int, int]:
+        """
+        a*P + b*Q in one interleaved pass (Straus / Shamir trick) over the joint sparse form
+        of (a, b): the doublings are shared, P, Q, P+Q and P-Q are precomputed
+
+        Args:
+            integer0 (int): a, negative for -P
+            x0 (int): coord x of P
+            y0 (int): coord y of P
+            integer1 (int): b, negative for -Q
+            x1 (int): coord x of Q
+            y1 (int): coord y of Q
+
+        Returns:
+            tuple[int, int]: a*P + b*Q
+        """
+        if integer0 < 0:
+            integer0, (x0, y0) = -integer0, self.negative_point(x0, y0)
+        if integer1 < 0:
+            integer1, (x1, y1) = -integer1, self.negative_point(x1, y1)
+        p0, p1 = self.to_jacobian(x0, y0), self.to_jacobian(x1, y1)
+        negative_p1 = (p1[0], -p1[1] % self.prime, p1[2])
+        points = self.batch_to_affine(
+            [p0, p1, self.jacobian_addition(*p0, *p1), self.jacobian_addition(*p0, *negative_p1)]
+        )
+        # (u0, u1) -> u0*P + u1*Q, the opposite pairs by negation
+        table = {(1, 0): points[0], (0, 1): points[1], (1, 1): points[2], (1, -1): points[3]}
+        for (u0, u1), (x, y) in list(table.items()):
+            table[(-u0, -u1)] = self.negative_point(x, y)
+
+        result = JACOBIAN_INFINITY
+        for digits in reversed(joint_sparse_form(integer0, integer1)):
+            result = self.jacobian_double(*result)
+            if digits != (0, 0):
+                x, y = table[digits]
+                if x is not None:
+                    result = self.jacobian_addition(*result, x, y, 1)
+        return self.to_affine(*result)
+
+    def substraction(self, xp: int, yp: int, xq: int, yq: int) -> tuple[int, int]:
+        """
+        subtract two points, P + (-Q)
+
+        Args:
+            xp (int): coord x of point 1
+            yp (int): coord y of point 1
+            xq (int): coord x of point 2
+            yq (int): coord y of point 2
+
+        Returns:
+            tuple[int, int]: P - Q
+        """
+        return self.addition(xp, yp, *self.negative_point(xq, yq))
+
+
+class FixedBasePoint:
+    """
+    Fixed-base scalar multiplication k*G with a precomputed table: with k written in signed
+    base-2^w digits |d_i| <= 2^(w-1), table[i][d-1] = d * 2^(w*i) * G, and k*G is one mixed
+    addition per digit, without any doubling. The table holds about bits/w * 2^(w-1) points.
+    """
+
+    def __init__(self, curve: ECurve_GFP, x: int, y: int, bits: int = None, window: int = 6):
+        """
+        precompute the table of a base point
+
+        Args:
+            curve (ECurve_GFP): the elliptic curve
+            x (int): coord x of the base point G
+            y (int): coord y of the base point G
+            bits (int, optional): largest scalar size served by the table (larger ones use the curve). Defaults to the size of p + 1.
+            window (int, optional): bits per digit. Defaults to 6.
+        """
+        assert window > 1
+        self.curve = curve
+        self.x = x
+        self.y = y
+        self.bits = bits or curve.prime.bit_length() + 1
+        self.window = window
+
+        half = 1 << (window - 1)
+        rows = []
+        row_base = curve.to_jacobian(x, y)
+        # one extra row for the carry of the top digit
+        for _ in range(-(-self.bits // window) + 1):
+            row = [row_base]
+            for _ in range(half - 1):
+                row.append(curve.jacobian_addition(*row[-1], *row_base))
+            rows.append(row)
+            # next row starts at 2^(w*(i+1)) G = 2 * (2^(w-1) * 2^(w*i) G)
+            row_base = curve.jacobian_double(*row[-1])
+        # normalize everything with a single inversion
+        flat = curve.batch_to_affine([point for row in rows for point in row])
+        self.table = [flat[i : i + half] for i in range(0, len(flat), half)]
+
+    def __repr__(self) -> str:
+        """
+        printable representation of the table
+
+        Returns:
+            str: table parameters
+        """
+        return (
+            f"FixedBasePoint(curve={self.curve.get_equation()}, G=({self.x}, {self.y}), "
+            f"bits={self.bits}, window={self.window})"
+        )
+
+    def multiplication(self, integer: int) -> tuple[int, int]:
+        """
+        k*G
+
+        Args:
+            integer (int): k
+
+        Returns:
+            tuple[int, int]: k*G, INFINITY for k = 0
+        """
+        if integer < 0 or integer.bit_length() > self.bits:
+            return self.curve.multiplication(integer, self.x, self.y)
+        curve, window = self.curve, self.window
+        mask, half = (1 << window) - 1, 1 << (window - 1)
+        p = curve.prime
+        result = JACOBIAN_INFINITY
+        for row in self.table:
+            if not integer:
+                break
+            digit = integer & mask
+            integer >>= window
+            if digit > half:
+                # signed digit, the carry goes to the next one
+                digit -= 1 << window
+                integer += 1
+            if digit:
+                x, y = row[abs(digit) - 1]
+                if x is not None:
+                    result = curve.jacobian_addition(*result, x, y if digit > 0 else p - y, 1)
+        return curve.to_affine(*result)
+
+    def save(self, path: str) -> None:
+        """
+        write the curve, the base point and the table as .json
+
+        Args:
+            path (str): file name without extension
+        """
+        import json
+
+        with open(f"{path}.json", "w") as f:
+            json.dump(
+                {
+                    "prime": str(self.curve.prime),
+                    "a": str(self.curve.a),
+                    "b": str(self.curve.b),
+                    "x": str(self.x),
+                    "y": str(self.y),
+                    "bits": self.bits,
+                    "window": self.window,
+                    "table": [
+                        [None if x is None else [str(x), str(y)] for x, y in row]
+                        for row in self.table
+                    ],
+                },
+                f,
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "FixedBasePoint":
+        """
+        read a table saved with FixedBasePoint.save, no point is recomputed
+
+        Args:
+            path (str): file name without extension
+
+        Returns:
+            FixedBasePoint: the table
+        """
+        import json
+
+        with open(f"{path}.json") as f:
+            params = json.load(f)
+        table = cls.__new__(cls)
+        table.curve = ECurve_GFP(int(params["prime"]), int(params["a"]), int(params["b"]))
+        table.x = int(params["x"])
+        table.y = int(params["y"])
+        table.bits = params["bits"]
+        table.window = params["window"]
+        table.table = [
+            [INFINITY if point is None else (int(point[0]), int(point[1])) for point in row]
+            for row in params["table"]
+        ]
+        return table
+
+
+# fixed-base tables kept by get_fixed_base, least recently used first
+FIXED_BASE_POINTS_CACHED = 8
+_fixed_base_points = OrderedDict()
+
+
+def get_fixed_base(curve: ECurve_GFP, x: int, y: int, window: int = 6) -> FixedBasePoint:
+    """
+    fixed-base table of (curve, G), built once and kept for the next keys and encryptions:
+    the FIXED_BASE_POINTS_CACHED tables used last are kept, the older ones are released
+
+    Args:
+        curve (ECurve_GFP): the elliptic curve
+        x (int): coord x of the base point G
+        y (int): coord y of the base point G
+        window (int, optional): bits per digit. Defaults to 6.
+
+    Returns:
+        FixedBasePoint: the cached table
+    """
+    key = (curve.prime, curve.a % curve.prime, curve.b % curve.prime, x, y, window)
+    if key in _fixed_base_points:
+        _fixed_base_points.move_to_end(key)
+    else:
+        _fixed_base_points[key] = FixedBasePoint(curve, x, y, window=window)
+        if len(_fixed_base_points) > FIXED_BASE_POINTS_CACHED:
+            _fixed_base_points.popitem(last=False)
+    return _fixed_base_points[key]
 
 
 class ECC:
@@ -329,7 +1399,9 @@ class ECC:
     Elliptic curve cryptographic implementation
     """
 
-    def __init__(self, curve: ECurve_GFP, x: int, y: int, private_key: int):
+    def __init__(
+        self, curve: ECurve_GFP, x: int, y: int, private_key: int, window: int = 6
+    ):
         """
         algo and parameters initialization
 
@@ -338,14 +1410,32 @@ class ECC:
             x (int): a point x coordinate
             y (int): a point y coordinate
             private_key (int): an ECC private key
+            window (int, optional): bits per digit of the cached table of multiples of (x, y), 0 to go without. Defaults to 6.
         """
         assert curve.is_point(x, y)
         self.curve = curve
         self.x = x
         self.y = y
         self.private_key = private_key
+        self.base_point: FixedBasePoint = None
+        if window:
+            self.base_point = get_fixed_base(curve, x, y, window)
         self.public_key = self._set_public_key()
 
+    def multiply_base(self, integer: int) -> tuple[int, int]:
+        """
+        k times the base point, with the fixed-base table when there is one
+
+        Args:
+            integer (int): k
+
+        Returns:
+            tuple[int, int]: k*G
+        """
+        if self.base_point is None:
+            return self.curve.multiplication(integer, self.x, self.y)
+        return self.base_point.multiplication(integer)
+
     def _set_public_key(self) -> tuple[int, int]:
         """
         set a ECC public key from the ECC private key
@@ -353,7 +1443,7 @@ class ECC:
         Returns:
             tuple[int, int]: ECC public key
         """
-        return self.curve.multiplication(self.private_key, self.x, self.y)
+        return self.multiply_base(self.private_key)
 
     def get_public_key(self) -> tuple[int, int]:
         """
@@ -376,14 +1466,67 @@ class ECC:
             tuple[int, int]: ciphertext
         """
         assert self.curve.is_point(message[0], message[1])
-        part1 = self.curve.multiplication(k, self.x, self.y)
+        part1 = self.multiply_base(k)
         part2 = self.curve.multiplication(k, self.public_key[0], self.public_key[1])
         part2 = self.curve.addition(message[0], message[1], part2[0], part2[1])
         return (part1, part2)
 
-    def decrypt(self):
-        # TODO: ECC.decrypt() need ECurve_GFP.substration()
-        raise NotImplementedError
+    def decrypt(self, ciphertext: tuple[tuple[int, int], tuple[int, int]]) -> tuple[int, int]:
+        """
+        ECC decryption implementation: M = (M + k*PubKey) - private_key*(k*G)
+
+        Args:
+            ciphertext (tuple[tuple[int, int], tuple[int, int]]): (k*G, M + k*PubKey)
+
+        Returns:
+            tuple[int, int]: plaintext point
+        """
+        part1, part2 = ciphertext
+        assert self.curve.is_point(*part1) and self.curve.is_point(*part2)
+        # 1*part2 + (-private_key)*part1 in a single pass
+        return self.curve.multi_multiplication(1, *part2, -self.private_key, *part1)
+
+    def encrypt_many(
+        self, ks: list[int], messages: list[tuple[int, int]], window: int = 6
+    ) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+        """
+        encrypt many messages, both k*G and k*PubKey from fixed-base tables for large batches
+
+        Args:
+            ks (list[int]): one time keys, one per message
+            messages (list[tuple[int, int]]): plaintext points
+            window (int, optional): bits per digit of the public key table. Defaults to 6.
+
+        Returns:
+            list[tuple[tuple[int, int], tuple[int, int]]]: ciphertexts, in order
+        """
+        ks, messages = list(ks), list(messages)
+        assert len(ks) == len(messages)
+        if len(messages) < 16:
+            return [self.encrypt(k, message) for k, message in zip(ks, messages)]
+        # the table of the public key pays for itself after a few multiplications, it is built for
+        # this batch only: a cached table per recipient would pile up in the module cache
+        public_point = FixedBasePoint(self.curve, *self.public_key, window=window)
+        ciphertexts = []
+        for k, message in zip(ks, messages):
+            assert self.curve.is_point(message[0], message[1])
+            part2 = self.curve.addition(*message, *public_point.multiplication(k))
+            ciphertexts.append((self.multiply_base(k), part2))
+        return ciphertexts
+
+    def decrypt_many(
+        self, ciphertexts: list[tuple[tuple[int, int], tuple[int, int]]]
+    ) -> list[tuple[int, int]]:
+        """
+        decrypt many ciphertexts
+
+        Args:
+            ciphertexts (list[tuple[tuple[int, int], tuple[int, int]]]): outputs of encrypt
+
+        Returns:
+            list[tuple[int, int]]: plaintext points, in order
+        """
+        return [self.decrypt(ciphertext) for ciphertext in ciphertexts]
 
 
 class ECurve_GF2(ECurve):
@@ -419,3 +1562,4 @@ class ECurve_GF2(ECurve):
 # message = gfp.list_point()[8]
 # cipher = ecc.encrypt(7, message)
 # print(cipher)
+# print(ecc.decrypt(cipher))
@@ -0,0 +1,535 @@
+"""
+Prime sieves used to speed up the number theory functions of the toolbox
+"""
+
+import math
+import mmap
+import os
+import struct
+from array import array
+
+# header of a saved sieve: magic + limit (little-endian unsigned 64 bits)
+_MAGIC = b"PSIEVE01"
+_HEADER = struct.Struct("<8sQ")
+
+
+def _pack_bits(flags: bytearray) -> bytes:
+    """
+    pack a sequence of 0/1 bytes into a bit array (bit i of byte i // 8)
+
+    Args:
+        flags (bytearray): one byte (0 or 1) per value, length multiple of 8
+
+    Returns:
+        bytes: packed bits, little-endian inside each byte
+    """
+    packed = 0
+    for bit in range(8):
+        # every byte of flags[bit::8] is 0 or 1, so the shift never crosses a byte
+        packed |= int.from_bytes(flags[bit::8], "little") << bit
+    return packed.to_bytes(len(flags) // 8, "little")
+
+
+class PrimeSieve:
+    """
+    Segmented sieve of Eratosthenes stored as a bit array of the odd numbers only.
+    Bit i of the array is set when 2i + 1 is a prime.
+    """
+
+    def __init__(
+        self, limit: int = 1 << 16, max_limit: int = 1 << 26, segment_size: int = 1 << 18
+    ):
+        """
+        sieve initialization
+
+        Args:
+            limit (int, optional): first sieved bound. Defaults to 2^16.
+            max_limit (int, optional): the sieve never grows on demand past this bound. Defaults to 2^26.
+            segment_size (int, optional): numbers sieved at once when growing. Defaults to 2^18.
+        """
+        assert limit > 2
+        self.max_limit = max(max_limit, limit)
+        self.segment_size = segment_size - segment_size % 16
+        self.limit = 1
+        self.bits = bytearray()
+        self.extend(limit)
+
+    def __repr__(self) -> str:
+        """
+        printable representation of the sieve
+
+        Returns:
+            str: sieve bounds
+        """
+        return f"PrimeSieve(limit={self.limit}, max_limit={self.max_limit})"
+
+    def _base_primes(self, bound: int) -> list[int]:
+        """
+        odd primes below bound used to cross out a new segment
+
+        Args:
+            bound (int): exclusive upper bound, at most self.limit
+
+        Returns:
+            list[int]: odd primes p < bound
+        """
+        return [p for p in self.primes(bound) if p != 2]
+
+    def _sieve_segment(self, low: int, high: int, base_primes: list[int]) -> bytearray:
+        """
+        sieve the odd numbers of [low, high) with one byte per odd number
+
+        Args:
+            low (int): inclusive lower bound, odd
+            high (int): exclusive upper bound, odd
+            base_primes (list[int]): all odd primes up to sqrt(high)
+
+        Returns:
+            bytearray: flags[i] is 1 when low + 2i is prime
+        """
+        size = (high - low) // 2
+        flags = bytearray(b"\x01") * size
+        for p in base_primes:
+            start = max(p * p, (low + p - 1) // p * p)
+            if start % 2 == 0:
+                start += p
+            if start >= high:
+                continue
+            index = (start - low) // 2
+            flags[index::p] = bytes(len(range(index, size, p)))
+        if low == 1:
+            flags[0] = 0
+        return flags
+
+    def extend(self, new_limit: int) -> None:
+        """
+        grow the sieve so that it covers every integer below new_limit
+
+        Args:
+            new_limit (int): new exclusive upper bound
+        """
+        # keep the bound aligned on a full byte of odd numbers
+        new_limit = -(-new_limit // 16) * 16 + 1
+        if new_limit <= self.limit:
+            return
+
+        # base primes up to sqrt(new_limit) come from the sieve itself
+        root = math.isqrt(new_limit) + 1
+        if self.limit == 1:
+            base_primes = [
+                p for p in range(3, root, 2) if all(p % d for d in range(3, p, 2))
+            ]
+        else:
+            if root > self.limit:
+                self.extend(root)
+            base_primes = self._base_primes(root)
+
+        bits = bytearray(self.bits)
+        low = self.limit
+        while low < new_limit:
+            high = min(low + self.segment_size, new_limit)
+            bits += _pack_bits(self._sieve_segment(low, high, base_primes))
+            low = high
+        self.bits = bits
+        self.limit = new_limit
+
+    def covers(self, n: int) -> bool:
+        """
+        check if n is below the sieve limit, growing the sieve up to max_limit if needed
+
+        Args:
+            n (int): an integer
+
+        Returns:
+            bool: the sieve can answer for n
+        """
+        if n < self.limit:
+            return True
+        if n >= self.max_limit:
+            return False
+        self.extend(min(max(2 * self.limit, n + 1), self.max_limit))
+        return True
+
+    def is_prime(self, n: int) -> bool:
+        """
+        O(1) primality lookup
+
+        Args:
+            n (int): integer below max_limit
+
+        Raises:
+            ValueError: n is beyond max_limit
+
+        Returns:
+            bool: n is a prime
+        """
+        if n < 3:
+            return n == 2
+        if n % 2 == 0:
+            return False
+        # covers grows the sieve: not an assert, which python -O would strip
+        if not self.covers(n):
+            raise ValueError(f"{n} is beyond the sieve maximum limit {self.max_limit}")
+        index = n >> 1
+        return bool(self.bits[index >> 3] >> (index & 7) & 1)
+
+    def primes(self, bound: int = None):
+        """
+        iterate over the primes of the sieve
+
+        Args:
+            bound (int, optional): exclusive upper bound. Defaults to the sieve limit.
+
+        Raises:
+            ValueError: bound is beyond max_limit
+
+        Yields:
+            int: primes in increasing order
+        """
+        if bound is None:
+            bound = self.limit
+        if not self.covers(bound - 1):
+            raise ValueError(f"{bound - 1} is beyond the sieve maximum limit {self.max_limit}")
+        if bound > 2:
+            yield 2
+        bits = self.bits
+        for byte_index in range(len(bits)):
+            byte = bits[byte_index]
+            base = byte_index << 4
+            while byte:
+                low_bit = byte & -byte
+                p = base + 2 * low_bit.bit_length() - 1
+                if p >= bound:
+                    return
+                yield p
+                byte ^= low_bit
+
+    def save(self, path: str) -> None:
+        """
+        write the sieve to disk, it can be memory-mapped back with PrimeSieve.load
+
+        Args:
+            path (str): file name
+        """
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, self.limit))
+            f.write(self.bits)
+
+    @classmethod
+    def load(cls, path: str, max_limit: int = None) -> "PrimeSieve":
+        """
+        memory-map a sieve saved with PrimeSieve.save, only the pages looked up are read
+
+        Args:
+            path (str): file name
+            max_limit (int, optional): growth bound. Defaults to the saved limit.
+
+        Returns:
+            PrimeSieve: a read-only mapped sieve (copied in memory if it has to grow)
+        """
+        with open(path, "rb") as f:
+            magic, limit = _HEADER.unpack(f.read(_HEADER.size))
+            assert magic == _MAGIC, f"{path} is not a saved PrimeSieve"
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        sieve = cls.__new__(cls)
+        sieve.limit = limit
+        sieve.max_limit = max(limit, max_limit or limit)
+        sieve.segment_size = 1 << 18
+        sieve.bits = memoryview(mapped)[_HEADER.size :]
+        return sieve
+
+
+class SmallestPrimeFactorTable:
+    """
+    Table of the smallest prime factor of every integer below a limit
+    """
+
+    def __init__(self, limit: int = 1 << 20, sieve: PrimeSieve = None):
+        """
+        build the table, O(limit log log limit) with slice assignments
+
+        Args:
+            limit (int, optional): exclusive upper bound. Defaults to 2^20.
+            sieve (PrimeSieve, optional): sieve giving the primes up to sqrt(limit). Defaults to the shared sieve.
+        """
+        sieve = sieve or get_sieve()
+        self.limit = limit
+        spf = array("I", range(limit))
+
+        # write the largest primes first so that the smallest factor wins
+        for p in reversed(list(sieve.primes(math.isqrt(limit - 1) + 1))):
+            count = len(range(p * p, limit, p))
+            spf[p * p :: p] = array("I", [p]) * count
+        self.spf = spf
+
+    def __getitem__(self, n: int) -> int:
+        """
+        smallest prime factor of n
+
+        Args:
+            n (int): integer, 1 < n < limit
+
+        Returns:
+            int: smallest prime factor
+        """
+        return self.spf[n]
+
+    def factorize(self, n: int) -> list[int]:
+        """
+        all the prime factors of n with repetition, in increasing order
+
+        Args:
+            n (int): integer, 1 < n < limit
+
+        Returns:
+            list[int]: prime factors
+        """
+        assert 1 < n < self.limit
+        spf = self.spf
+        factors = []
+        while n > 1:
+            p = spf[n]
+            factors.append(p)
+            n //= p
+        return factors
+
+
+_shared_sieve = None
+_shared_spf = None
+
+
+def get_sieve() -> PrimeSieve:
+    """
+    shared prime sieve, created on first use. Set the PRIME_SIEVE_PATH environment
+    variable to memory-map a sieve saved with PrimeSieve.save instead of building it.
+
+    Returns:
+        PrimeSieve: the module sieve
+    """
+    global _shared_sieve
+    if _shared_sieve is None:
+        path = os.environ.get("PRIME_SIEVE_PATH")
+        if path and os.path.exists(path):
+            _shared_sieve = PrimeSieve.load(path, max_limit=1 << 26)
+        else:
+            _shared_sieve = PrimeSieve()
+    return _shared_sieve
+
+
+def get_spf_table() -> SmallestPrimeFactorTable:
+    """
+    shared smallest prime factor table, created on first use
+
+    Returns:
+        SmallestPrimeFactorTable: the module table
+    """
+    global _shared_spf
+    if _shared_spf is None:
+        _shared_spf = SmallestPrimeFactorTable()
+    return _shared_spf
+
+
+class ArithmeticTables:
+    """
+    NumPy tables of euler totient (phi), mobius (mu), smallest prime factor (spf)
+    and number of distinct prime factors (omega) for every n in [start, limit)
+    """
+
+    TABLES = ("phi", "mu", "spf", "omega")
+
+    def __init__(self, limit: int, start: int = 0, sieve: PrimeSieve = None):
+        """
+        fill the four tables with one strided NumPy pass per prime up to sqrt(limit),
+        the factor left above sqrt(limit) is then a prime handled in a single vectorized step
+
+        Args:
+            limit (int): exclusive upper bound
+            start (int, optional): first n of the tables. Defaults to 0.
+            sieve (PrimeSieve, optional): sieve giving the primes up to sqrt(limit). Defaults to the shared sieve.
+        """
+        import numpy as np
+
+        assert 0 <= start < limit
+        sieve = sieve or get_sieve()
+        self.start = start
+        self.limit = limit
+        size = limit - start
+
+        n = np.arange(start, limit, dtype=np.int64)
+        rest = n.copy()
+        phi = n.copy()
+        mu = np.ones(size, dtype=np.int8)
+        omega = np.zeros(size, dtype=np.uint8)
+        spf = np.zeros(size, dtype=np.int64)
+
+        for p in sieve.primes(math.isqrt(limit - 1) + 1):
+            multiples = slice((-start) % p, None, p)
+            phi[multiples] -= phi[multiples] // p
+            mu[multiples] *= -1
+            omega[multiples] += 1
+            rest[multiples] //= p
+            unset = spf[multiples]
+            unset[unset == 0] = p
+
+            power = p * p
+            while power < limit:
+                multiples = slice((-start) % power, None, power)
+                rest[multiples] //= p
+                mu[multiples] = 0
+                power *= p
+
+        # what is left is 1 or a prime larger than sqrt(limit)
+        large = rest > 1
+        phi[large] = phi[large] // rest[large] * (rest[large] - 1)
+        mu[large] *= -1
+        omega[large] += 1
+        spf[spf == 0] = rest[spf == 0]
+
+        if start == 0:
+            phi[0] = mu[0] = omega[0] = spf[0] = 0
+        if start <= 1 < limit:
+            spf[1 - start] = 1
+
+        self.phi, self.mu, self.spf, self.omega = phi, mu, spf, omega
+
+    def __repr__(self) -> str:
+        """
+        printable representation of the tables
+
+        Returns:
+            str: tables bounds
+        """
+        return f"ArithmeticTables(start={self.start}, limit={self.limit})"
+
+    def _index(self, n):
+        """
+        position of n in the tables
+
+        Args:
+            n (int | array-like): integers in [start, limit)
+
+        Returns:
+            int | np.ndarray: indexes
+        """
+        import numpy as np
+
+        index = np.asarray(n, dtype=np.int64) - self.start
+        assert np.all((index >= 0) & (index < self.limit - self.start)), "n out of the tables"
+        return index
+
+    def totient(self, n):
+        """
+        vectorized euler totient lookup
+
+        Args:
+            n (int | array-like): integers in [start, limit)
+
+        Returns:
+            int | np.ndarray: phi(n)
+        """
+        return self.phi[self._index(n)]
+
+    def mobius(self, n):
+        """
+        vectorized mobius lookup
+
+        Args:
+            n (int | array-like): integers in [start, limit)
+
+        Returns:
+            int | np.ndarray: mu(n)
+        """
+        return self.mu[self._index(n)]
+
+    def smallest_prime_factor(self, n):
+        """
+        vectorized smallest prime factor lookup
+
+        Args:
+            n (int | array-like): integers in [start, limit)
+
+        Returns:
+            int | np.ndarray: spf(n)
+        """
+        return self.spf[self._index(n)]
+
+    def distinct_prime_factors(self, n):
+        """
+        vectorized lookup of the number of distinct prime factors
+
+        Args:
+            n (int | array-like): integers in [start, limit)
+
+        Returns:
+            int | np.ndarray: omega(n)
+        """
+        return self.omega[self._index(n)]
+
+    @classmethod
+    def iter_chunks(cls, limit: int, chunk_size: int = 1 << 22, start: int = 0):
+        """
+        tables of [start, limit) computed chunk by chunk, to go beyond the available memory
+
+        Args:
+            limit (int): exclusive upper bound
+            chunk_size (int, optional): numbers per chunk. Defaults to 2^22.
+            start (int, optional): first n. Defaults to 0.
+
+        Yields:
+            ArithmeticTables: tables of consecutive chunks
+        """
+        for low in range(start, limit, chunk_size):
+            yield cls(min(low + chunk_size, limit), start=low)
+
+    @classmethod
+    def build_memmap(cls, limit: int, directory: str, chunk_size: int = 1 << 22) -> "ArithmeticTables":
+        """
+        compute the tables chunk by chunk straight into .npy files, then map them back
+
+        Args:
+            limit (int): exclusive upper bound
+            directory (str): folder receiving phi.npy, mu.npy, spf.npy and omega.npy
+            chunk_size (int, optional): numbers computed at once. Defaults to 2^22.
+
+        Returns:
+            ArithmeticTables: disk-backed tables of [0, limit)
+        """
+        import numpy as np
+
+        os.makedirs(directory, exist_ok=True)
+        outputs = {}
+        for chunk in cls.iter_chunks(limit, chunk_size):
+            for name in cls.TABLES:
+                values = getattr(chunk, name)
+                if name not in outputs:
+                    outputs[name] = np.lib.format.open_memmap(
+                        os.path.join(directory, f"{name}.npy"),
+                        mode="w+",
+                        dtype=values.dtype,
+                        shape=(limit,),
+                    )
+                outputs[name][chunk.start : chunk.limit] = values
+        for output in outputs.values():
+            output.flush()
+        return cls.load(directory)
+
+    @classmethod
+    def load(cls, directory: str) -> "ArithmeticTables":
+        """
+        memory-map tables written by ArithmeticTables.build_memmap
+
+        Args:
+            directory (str): folder of the .npy files
+
+        Returns:
+            ArithmeticTables: disk-backed tables of [0, limit)
+        """
+        import numpy as np
+
+        tables = cls.__new__(cls)
+        for name in cls.TABLES:
+            setattr(tables, name, np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r"))
+        tables.start = 0
+        tables.limit = len(tables.phi)
+        return tables
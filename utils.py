@@ -4,9 +4,15 @@ Some mathematical functions useful to implements cryptographic algorithms
 
 import math
 import random
+from collections import Counter
 
-import numpy as np
-import pandas as pd
+from discrete_logarithm import get_baby_step_table
+from factorization import factorize
+from primality import is_probable_prime
+from primitive_root import iter_primitive_roots
+from sieve import get_sieve, get_spf_table
+
+# numpy and pandas are heavy to import: they are loaded only by the functions using them
 
 
 def _bin(dec_val: int, length: int) -> str:
@@ -39,6 +45,8 @@ def _dec(bin_val: str) -> int:
 def is_prime(n: int) -> bool:
     """
     test if a number is prime. use a deterministic method.
+    O(1) lookup in the shared sieve below its maximum limit, deterministic
+    Miller-Rabin up to 2^64 and Baillie-PSW above.
 
     Args:
         n (int): integer to do primality test
@@ -47,15 +55,16 @@ def is_prime(n: int) -> bool:
         bool: n is a prime
     """
     assert n > 1
-    for i in range(2, int(math.sqrt(n)) + 1):
-        if n % i == 0:
-            return False
-    return True
+    sieve = get_sieve()
+    if sieve.covers(n):
+        return sieve.is_prime(n)
+    return is_probable_prime(n)
 
 
 def prime_factors(n: int) -> list:
     """
-    get all the prime numbers of a composite number
+    get all the prime numbers of a composite number.
+    lookup in the smallest prime factor table for small n, staged factorization engine above.
 
     Args:
         n (int): an integer
@@ -63,17 +72,13 @@ def prime_factors(n: int) -> list:
     Returns:
         list: all the prime factors
     """
+    spf = get_spf_table()
+    if n < spf.limit:
+        return spf.factorize(n) if n > 1 else []
 
     factors = []
-    while n % 2 == 0:
-        factors.append(2)
-        n = n / 2
-    for i in range(3, int(math.sqrt(n)) + 1, 2):
-        while n % i == 0:
-            factors.append(i)
-            n = n / i
-    if n > 2:
-        factors.append(int(n))
+    for prime, power in factorize(n).items():
+        factors.extend([prime] * power)
     return factors
 
 
@@ -89,24 +94,22 @@ def phi(n: int) -> int:
     """
     if is_prime(n):
         return n - 1
-    primes = prime_factors(n)
-
-    df = pd.value_counts(np.array(primes))
-
     value = 1
-    for prime, power in zip(list(df.index), df.values):
+    for prime, power in Counter(prime_factors(n)).items():
         value *= prime**power - prime ** (power - 1)
 
     return value
 
 
-def print_all(df: pd.DataFrame) -> None:
+def print_all(df: "pd.DataFrame") -> None:
     """
     a function to print all row/col of a dataframe when the size is bigger than pandas default value
 
     Args:
         df (pd.DataFrame): any printable dataframe
     """
+    import pandas as pd
+
     pd.set_option("display.max_rows", None)
     pd.set_option("display.max_columns", None)
     print(df)
@@ -114,38 +117,36 @@ def print_all(df: pd.DataFrame) -> None:
     pd.reset_option("display.max_columns", None)
 
 
-def primitive_roots(modulo: int) -> None:
+def primitive_roots(modulo: int, table: bool = False) -> list[int]:
     """
     get the primitive root modulo n
 
     Args:
         modulo (int): mod
+        table (bool, optional): also print the a^power table (teaching view, O(n^2)). Defaults to False.
+
+    Returns:
+        list[int]: all the primitive roots
     """
+    if table:
+        import pandas as pd
 
-    data = {"a": list(range(1, modulo))}
-    for power in range(2, modulo):
-        col_name = f"a^{power}"
-        values = []
-        for value in range(1, modulo):
-            values.append((value**power) % modulo)
-        data[col_name] = values
+        data = {"a": list(range(1, modulo))}
+        for power in range(2, modulo):
+            col_name = f"a^{power}"
+            values = []
+            for value in range(1, modulo):
+                values.append(pow(value, power, modulo))
+            data[col_name] = values
 
-    df = pd.DataFrame(data).set_index("a")
+        df = pd.DataFrame(data).set_index("a")
 
-    print_all(df)
+        print_all(df)
 
-    phi_value = phi(modulo)
-    roots = []
-    for index, val in enumerate(df.index):
-        try:
-            at_power = df.values[index].tolist().index(1)
-            at_power += 2
-            if at_power == phi_value:
-                roots.append(val)
-        except ValueError:
-            pass
+    roots = list(iter_primitive_roots(modulo))
 
     print(f"\nThere is {len(roots)} Primitve roots of {modulo}: {roots}")
+    return roots
 
 
 def get_n_bit_odd_number(n_bits: int) -> tuple[int, str]:
@@ -185,9 +186,9 @@ def miller_rabin(odd_integer: int, confidence: int) -> bool:
     k = 0
     reduction = odd_integer - 1
     while reduction % 2 == 0:
-        reduction /= 2
+        reduction //= 2
         k += 1
-    q = (odd_integer - 1) // (2**k)
+    q = reduction
 
     # Do t=confidence miller-rabin test
     for _ in range(confidence):
@@ -198,14 +199,17 @@ def miller_rabin(odd_integer: int, confidence: int) -> bool:
         # Test
         inconclusive = False
 
-        if pow(base=a, exp=q, mod=odd_integer) == 1:
+        a_power = pow(base=a, exp=q, mod=odd_integer)
+        if a_power == 1:
             inconclusive = True
             continue
 
-        for j in range(k):
-            if (a ** (2**j * q)) % odd_integer == odd_integer - 1:
+        # a^(2^j * q) mod n by repeated modular squaring
+        for _ in range(k):
+            if a_power == odd_integer - 1:
                 inconclusive = True
                 break
+            a_power = a_power * a_power % odd_integer
 
         if not inconclusive:
             return False
@@ -219,7 +223,8 @@ def n_test_miller_rabin(bits: int) -> int:
 
 def discrete_log(base: int, value: int, modulo: int):
     """
-    calculate the discrete log
+    calculate the discrete log with baby-step giant-step. the baby-step table of
+    (base, modulo) is built once and reused by the next calls.
 
     Args:
         base (int): log base
@@ -227,25 +232,12 @@ def discrete_log(base: int, value: int, modulo: int):
         modulo (int): mod
 
     Returns:
-        _type_: _description_
-    """
-    N = None
-    if not N:
-        N = 1 + int(math.sqrt(modulo))
-
-    # initialize baby_steps table
-    baby_steps = {}
-    baby_step = 1
-    for r in range(N + 1):
-        baby_steps[baby_step] = r
-        baby_step = baby_step * base % modulo
-
-    # now take the giant steps
-    giant_stride = pow(base, (modulo - 2) * N, modulo)
-    giant_step = value
-    for q in range(N + 1):
-        if giant_step in baby_steps:
-            return q * N + baby_steps[giant_step]
-        else:
-            giant_step = giant_step * giant_stride % modulo
-    return "No Match"
+        int | str: the logarithm, or "No Match" when value is not a power of base (or base is not a unit)
+    """
+    if math.gcd(base, modulo) != 1:
+        return "No Match"
+    table = get_baby_step_table(base, modulo)
+    log = table.log(value)
+    if log is None:
+        return "No Match"
+    return log